@@ -17,11 +17,10 @@ __description__ = "AI-powered news verification system"
 from .core.analyzer import CredibilityAnalyzer
 from .core.database import NewsDatabase
 from .core.cache import NewsCache
-from .config.settings import config
 
+# The global config is created lazily; use ``newschecker.config.config``
 __all__ = [
     'CredibilityAnalyzer',
     'NewsDatabase', 
-    'NewsCache',
-    'config'
+    'NewsCache'
 ] 
\ No newline at end of file
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 import json
 
 # Import from new structure
-from ..core.database import db
+from ..core.database import get_db, run_db, format_timestamp
 from ..core.cache import news_cache
 from ..config.settings import config
 
@@ -23,7 +23,7 @@ async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         # Database statistics
-        db_stats = db.get_database_stats()
+        db_stats = await run_db(get_db().get_database_stats)
         
         # Cache statistics
         cache_stats = news_cache.get_stats()
@@ -67,8 +67,9 @@ async def admin_user_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
         
         user_id = int(context.args[0])
-        user_stats = db.get_user_stats(user_id)
-        user_history = db.get_user_history(user_id, limit=5)
+        user_stats = await run_db(get_db().get_user_stats, user_id)
+        # The history generator reads from the cursor, so drain it on the worker
+        user_history = await run_db(lambda: list(get_db().get_user_history(user_id, limit=5)))
         
         if not user_stats:
             await update.message.reply_text(f"❌ User {user_id} tapılmadı.")
@@ -85,7 +86,7 @@ async def admin_user_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
 📋 **Son Analizlər:**"""
         
         for analysis in user_history:
-            info_message += f"\n• {analysis['analyzed_date']}: {analysis['news_type']} - {analysis['credibility_score']}/10"
+            info_message += f"\n• {format_timestamp(analysis['analyzed_date'])}: {analysis['news_type']} - {analysis['credibility_score']}/10"
         
         await update.message.reply_text(info_message, parse_mode='Markdown')
         
@@ -125,10 +126,10 @@ async def admin_export_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         # Get recent analyses for export
-        from ..core.database import db
+        from ..core.database import get_db
         
         # This is a simplified export - in production you'd want to create actual files
-        stats = db.get_database_stats()
+        stats = await run_db(get_db().get_database_stats)
         export_info = {
             'export_date': datetime.now().isoformat(),
             'total_analyses': stats.get('total_analyses', 0),
@@ -80,10 +80,10 @@ class BotCommands:
         user_id = update.effective_user.id
         
         try:
-            from ..core.database import db
+            from ..core.database import get_db, run_db
             from ..utils.rate_limiting import rate_limiter
             
-            user_stats = db.get_user_stats(user_id)
+            user_stats = await run_db(get_db().get_user_stats, user_id)
             rate_stats = rate_limiter.get_user_stats(user_id)
             
             if user_stats:
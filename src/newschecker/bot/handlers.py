@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import CommandHandler, MessageHandler, filters, ContextTypes, ApplicationBuilder, CallbackQueryHandler
@@ -11,6 +12,7 @@ import re
 import easyocr
 from PIL import Image
 import io
+import threading
 import numpy
 from googleapiclient.discovery import build
 
@@ -19,7 +21,7 @@ from ..config.settings import config, get_official_search_params, get_news_searc
 from ..utils.logging import enhanced_logger, performance_monitor
 from ..utils.rate_limiting import rate_limiter, rate_limit_check
 from ..utils.security import security_validator, security_check, validate_image_file
-from ..core.database import db
+from ..core.database import get_db, run_db, format_timestamp
 from ..core.cache import news_cache
 from ..core.analyzer import credibility_analyzer
 
@@ -35,6 +37,12 @@ class BotHandlers:
         self.setup_gemini()
         self.setup_ocr()
         self.search_service = self.get_google_search_service()
+        
+        # Blocking calls run on worker threads; the OCR reader and the search
+        # client's HTTP connection are not thread-safe, so each is used by one
+        # thread at a time
+        self._ocr_lock = threading.Lock()
+        self._search_lock = threading.Lock()
     
     def setup_gemini(self):
         """Configure Gemini AI."""
@@ -69,13 +77,14 @@ class BotHandlers:
                 return {"items": []}
 
             enhanced_logger.debug(f"Sending request to Google Search API", query=query)
-            result = self.search_service.cse().list(
-                q=query,
-                cx=cx,
-                num=10,
-                gl="az",
-                hl="az"
-            ).execute()
+            with self._search_lock:
+                result = self.search_service.cse().list(
+                    q=query,
+                    cx=cx,
+                    num=10,
+                    gl="az",
+                    hl="az"
+                ).execute()
 
             enhanced_logger.debug(f"Received response from Google Search API", results_count=len(result.get("items", [])))
             return result
@@ -266,7 +275,7 @@ class BotHandlers:
             if image.mode != 'RGB':
                 image = image.convert('RGB')
             
-            results = self.reader.readtext(numpy.array(image))
+            results = await asyncio.to_thread(self._read_text, numpy.array(image))
             text = ' '.join([result[1] for result in results if result[2] > 0.5])
             
             enhanced_logger.debug("Text extraction from image completed", text_length=len(text))
@@ -275,6 +284,11 @@ class BotHandlers:
             enhanced_logger.error("Error in extract_text_from_image", error=e)
             return None
 
+    def _read_text(self, image_array):
+        """Run OCR on an image array, one call at a time."""
+        with self._ocr_lock:
+            return self.reader.readtext(image_array)
+
     def clean_markdown(self, text):
         """Clean text from problematic markdown characters."""
         text = text.replace('*', '')
@@ -316,12 +330,12 @@ class BotHandlers:
                 )
                 return
             
-            duplicate_check = db.check_duplicate(news_content)
+            duplicate_check = await run_db(get_db().check_duplicate, news_content)
             if duplicate_check:
                 enhanced_logger.debug("Using database duplicate", user_id=user_id)
                 duplicate_message = f"""📋 Bu xəbər əvvəllər analiz edilmişdir:
 
-📅 Analiz tarixi: {duplicate_check['analyzed_date']}
+📅 Analiz tarixi: {format_timestamp(duplicate_check['analyzed_date'])}
 ⭐ Etibarlılıq xalı: {duplicate_check['credibility_score']}/10
 
 {duplicate_check['analysis_result']}"""
@@ -333,9 +347,14 @@ class BotHandlers:
                 'content_length': len(news_content)
             })
             
-            mentioned_sources = self.extract_sources_from_text(news_content)
-            search_results = self.search_news_sources(news_content)
-            source_verification = self.verify_mentioned_sources(mentioned_sources, search_results["keywords"])
+            # Gemini and Google Search calls block for seconds, so they run on
+            # worker threads instead of stalling the event loop (which also
+            # serves the web interface when both run together)
+            mentioned_sources = await asyncio.to_thread(self.extract_sources_from_text, news_content)
+            search_results = await asyncio.to_thread(self.search_news_sources, news_content)
+            source_verification = await asyncio.to_thread(
+                self.verify_mentioned_sources, mentioned_sources, search_results["keywords"]
+            )
             credibility_analysis = credibility_analyzer.analyze_credibility(
                 news_content, search_results, mentioned_sources
             )
@@ -383,7 +402,7 @@ class BotHandlers:
             [Əgər varsa, əlavə qeydlər və xəbərdarlıqlar]
             """
 
-            response = self.model.generate_content(prompt)
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
             analysis = response.text
             analysis = self.clean_markdown(analysis)
             
@@ -401,7 +420,8 @@ class BotHandlers:
 
             news_cache.cache_analysis(news_content, enhanced_analysis)
             
-            db.save_analysis(
+            await run_db(
+                get_db().save_analysis,
                 user_id=user_id,
                 news_content=news_content,
                 news_type='text',
@@ -562,7 +582,7 @@ class BotHandlers:
                     "Zəhmət olmasa gözləyin..."
                 )
                 
-                news_content = self.extract_text_from_url(message_text)
+                news_content = await asyncio.to_thread(self.extract_text_from_url, message_text)
                 if not news_content:
                     await analyzing_message.edit_text(
                         "❌ Üzr istəyirəm, bu linkdən məzmun çəkə bilmədim.\n"
@@ -597,7 +617,7 @@ class BotHandlers:
         user_id = update.effective_user.id
         
         try:
-            user_stats = db.get_user_stats(user_id)
+            user_stats = await run_db(get_db().get_user_stats, user_id)
             rate_stats = rate_limiter.get_user_stats(user_id)
             
             if user_stats:
@@ -665,6 +685,22 @@ class BotApplication:
         
         enhanced_logger.info("Bot application setup completed")
     
+    async def run_async(self):
+        """Run the bot on the current event loop until cancelled."""
+        if not self.application:
+            self.setup_application()
+        
+        enhanced_logger.info("Starting NewsChecker bot...")
+        async with self.application:
+            await self.application.start()
+            await self.application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+            try:
+                # Polling runs in the background until this task is cancelled
+                await asyncio.Event().wait()
+            finally:
+                await self.application.updater.stop()
+                await self.application.stop()
+    
     def run(self):
         """Run the bot application."""
         if not self.application:
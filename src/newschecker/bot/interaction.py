@@ -1,189 +1,255 @@
+import json
 import logging
+from typing import Any, Union
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes
 
 # Import from new structure
-from ..core.database import db
+from ..core.database import get_db, run_db, format_timestamp
 
 logger = logging.getLogger(__name__)
 
-class UserInteraction:
-    def __init__(self):
-        pass
-    
-    @staticmethod
-    async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show main interaction menu"""
-        keyboard = [
-            [KeyboardButton("📰 Xəbər Analizi"), KeyboardButton("📊 Mənim Statistikam")],
-            [KeyboardButton("❓ Kömək"), KeyboardButton("⚙️ Ayarlar")],
-            [KeyboardButton("📚 Necə İstifadə Etmək Olar")]
-        ]
-        
-        reply_markup = ReplyKeyboardMarkup(
-            keyboard, 
-            resize_keyboard=True, 
-            one_time_keyboard=False
-        )
-        
-        await update.message.reply_text(
-            "🎯 **Əsas Menyu**\n\n"
-            "Aşağıdakı seçimlərdən birini seçin:",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
-    
-    @staticmethod
-    async def show_analysis_options(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show analysis type options"""
-        keyboard = [
-            [InlineKeyboardButton("📝 Mətn Analizi", callback_data="analysis_text")],
-            [InlineKeyboardButton("🔗 Link Analizi", callback_data="analysis_link")],
-            [InlineKeyboardButton("🖼️ Şəkil Analizi", callback_data="analysis_image")],
-            [InlineKeyboardButton("🔙 Geri", callback_data="back_to_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            "📰 **Xəbər Analizi Növləri**\n\n"
-            "Hansı növ analiz etmək istəyirsiniz?",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
-    
-    @staticmethod
-    async def show_user_stats_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show user statistics menu"""
-        user_id = update.effective_user.id
-        
-        try:
-            user_stats = db.get_user_stats(user_id)
-            user_history = db.get_user_history(user_id, limit=5)
-            
-            if user_stats:
-                stats_text = f"""📊 **Sizin Statistikalarınız**
+# MarkdownV2 escape table, applied once to every dynamic line we render
+_MDV2_ESCAPE = str.maketrans({char: '\\' + char for char in '\\_*[]()~`>#+-=|{}.!'})
 
-🔢 Ümumi analizlər: {user_stats['total_analyses']}
-📅 İlk analiz: {user_stats['first_analysis_date']}
-📅 Son analiz: {user_stats['last_analysis_date']}
-⭐ Orta etibarlılıq xalı: {user_stats.get('average_credibility_score', 0):.1f}
 
-📋 **Son 5 Analiz:**"""
-                
-                for i, analysis in enumerate(user_history, 1):
-                    stats_text += f"\n{i}. {analysis['news_type']} - {analysis['credibility_score']}/10"
-                
-                keyboard = [
-                    [InlineKeyboardButton("📈 Ətraflı Statistika", callback_data="detailed_stats")],
-                    [InlineKeyboardButton("🔙 Əsas Menyu", callback_data="back_to_menu")]
-                ]
-            else:
-                stats_text = """📊 **Sizin Statistikalarınız**
+def _md(text: Any) -> str:
+    """Escape text for MarkdownV2."""
+    return str(text).translate(_MDV2_ESCAPE)
 
-🔢 Hələ heç bir analiz etməmisiniz.
-💡 İlk xəbərinizi analiz etmək üçün "📰 Xəbər Analizi" seçin!"""
-                
-                keyboard = [
-                    [InlineKeyboardButton("📰 İlk Analizi Başlat", callback_data="analysis_text")],
-                    [InlineKeyboardButton("🔙 Əsas Menyu", callback_data="back_to_menu")]
-                ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await update.message.reply_text(stats_text, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        except Exception as e:
-            logger.error(f"Error showing user stats: {e}")
-            await update.message.reply_text("❌ Statistikalarınızı yükləməkdə xəta baş verdi.")
-    
-    @staticmethod
-    async def show_help_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show help menu"""
-        help_text = """❓ **Kömək və Məlumat**
 
-🤖 **Bot haqqında:**
+def _md_bold(text: Any) -> str:
+    """Escape text for MarkdownV2 and wrap it in bold markers."""
+    return f"*{_md(text)}*"
+
+
+def _serialize_markup(markup: Union[InlineKeyboardMarkup, ReplyKeyboardMarkup]) -> str:
+    """Serialize a static keyboard once; PTB sends str parameters verbatim."""
+    return json.dumps(markup.to_dict())
+
+
+# Main reply keyboard; is_persistent keeps it on the client between messages
+_MAIN_KB = _serialize_markup(ReplyKeyboardMarkup(
+    [
+        [KeyboardButton("📰 Xəbər Analizi"), KeyboardButton("📊 Mənim Statistikam")],
+        [KeyboardButton("❓ Kömək"), KeyboardButton("⚙️ Ayarlar")],
+        [KeyboardButton("📚 Necə İstifadə Etmək Olar")]
+    ],
+    resize_keyboard=True,
+    one_time_keyboard=False,
+    is_persistent=True
+))
+
+# Shared "back to menu" buttons
+_BACK_BUTTON = InlineKeyboardButton("🔙 Geri", callback_data="back_to_menu")
+_BACK_MAIN_BUTTON = InlineKeyboardButton("🔙 Əsas Menyu", callback_data="back_to_menu")
+
+# Static inline keyboards, serialized once at import
+_BACK_KB = _serialize_markup(InlineKeyboardMarkup([[_BACK_BUTTON]]))
+_BACK_MAIN_KB = _serialize_markup(InlineKeyboardMarkup([[_BACK_MAIN_BUTTON]]))
+_ANALYSIS_OPTIONS_KB = _serialize_markup(InlineKeyboardMarkup([
+    [InlineKeyboardButton("📝 Mətn Analizi", callback_data="analysis_text")],
+    [InlineKeyboardButton("🔗 Link Analizi", callback_data="analysis_link")],
+    [InlineKeyboardButton("🖼️ Şəkil Analizi", callback_data="analysis_image")],
+    [_BACK_BUTTON]
+]))
+_STATS_KB = _serialize_markup(InlineKeyboardMarkup([
+    [InlineKeyboardButton("📈 Ətraflı Statistika", callback_data="detailed_stats")],
+    [_BACK_MAIN_BUTTON]
+]))
+_FIRST_ANALYSIS_KB = _serialize_markup(InlineKeyboardMarkup([
+    [InlineKeyboardButton("📰 İlk Analizi Başlat", callback_data="analysis_text")],
+    [_BACK_MAIN_BUTTON]
+]))
+_HELP_KB = _serialize_markup(InlineKeyboardMarkup([
+    [InlineKeyboardButton("📋 Ətraflı Təlimat", callback_data="detailed_help")],
+    [_BACK_MAIN_BUTTON]
+]))
+_TUTORIAL_KB = _serialize_markup(InlineKeyboardMarkup([
+    [InlineKeyboardButton("📰 İndi Sınayın", callback_data="analysis_text")],
+    [_BACK_MAIN_BUTTON]
+]))
+
+# Static menu texts are sent as plain text so Telegram has nothing to parse
+MAIN_MENU_TEXT = (
+    "🎯 Əsas Menyu\n\n"
+    "Aşağıdakı seçimlərdən birini seçin:"
+)
+
+BACK_TO_MENU_TEXT = (
+    "🎯 Əsas Menyu\n\n"
+    "Aşağıdakı düymələrdən birini seçin və ya mətn yazın:"
+)
+
+ANALYSIS_OPTIONS_TEXT = (
+    "📰 Xəbər Analizi Növləri\n\n"
+    "Hansı növ analiz etmək istəyirsiniz?"
+)
+
+ANALYSIS_PROMPTS = {
+    'analysis_text': (
+        "📝 Mətn Analizi\n\n"
+        "Zəhmət olmasa analiz etmək istədiyiniz xəbər mətnini yazın:"
+    ),
+    'analysis_link': (
+        "🔗 Link Analizi\n\n"
+        "Zəhmət olmasa analiz etmək istədiyiniz xəbər linkini göndərin:"
+    ),
+    'analysis_image': (
+        "🖼️ Şəkil Analizi\n\n"
+        "Zəhmət olmasa analiz etmək istədiyiniz xəbər şəklini göndərin:"
+    ),
+}
+
+HELP_TEXT = """❓ Kömək və Məlumat
+
+🤖 Bot haqqında:
 Bu bot xəbərlərin doğruluğunu AI vasitəsilə analiz edir.
 
-📝 **İstifadə qaydası:**
+📝 İstifadə qaydası:
 1. Xəbər mətni, linki və ya şəkli göndərin
 2. Bot avtomatik analiz edəcək
 3. Etibarlılıq xalı və təfərrüatlı hesabat alacaqsınız
 
-⭐ **Etibarlılıq Xalları:**
+⭐ Etibarlılıq Xalları:
 • 8-10: Yüksək Etibarlı 🟢
 • 6-7.9: Etibarlı 🔵  
 • 4-5.9: Orta 🟡
 • 2-3.9: Şübhəli 🟠
 • 0-1.9: Etibarsız 🔴
 
-🔍 **Analiz Parametrləri:**
+🔍 Analiz Parametrləri:
 • Mənbə etibarlılığı
 • Məzmun keyfiyyəti
 • Dil istifadəsi
 • Faktiki doğrulama
 • Zaman uyğunluğu"""
-        
-        keyboard = [
-            [InlineKeyboardButton("📋 Ətraflı Təlimat", callback_data="detailed_help")],
-            [InlineKeyboardButton("🔙 Əsas Menyu", callback_data="back_to_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text(help_text, reply_markup=reply_markup, parse_mode='Markdown')
-    
-    @staticmethod
-    async def show_settings_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show settings menu"""
-        settings_text = """⚙️ **Tənzimləmələr**
 
-🔔 **Bildirişlər:** Aktiv
-🌐 **Dil:** Azərbaycan dili
-📊 **Statistika:** Aktiv
-🔒 **Məxfilik:** Yüksək
+SETTINGS_TEXT = """⚙️ Tənzimləmələr
+
+🔔 Bildirişlər: Aktiv
+🌐 Dil: Azərbaycan dili
+📊 Statistika: Aktiv
+🔒 Məxfilik: Yüksək
 
-💡 **Qeyd:** Tənzimləmələr hazırda əl ilə dəyişdirilə bilməz.
+💡 Qeyd: Tənzimləmələr hazırda əl ilə dəyişdirilə bilməz.
 Gələcək versiyalarda əlavə seçimlər əlavə ediləcək."""
-        
-        keyboard = [
-            [InlineKeyboardButton("🔙 Əsas Menyu", callback_data="back_to_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text(settings_text, reply_markup=reply_markup, parse_mode='Markdown')
-    
-    @staticmethod
-    async def show_tutorial(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Show tutorial"""
-        tutorial_text = """📚 **Necə İstifadə Etmək Olar**
 
-🎯 **Addım-addım təlimat:**
+TUTORIAL_TEXT = """📚 Necə İstifadə Etmək Olar
 
-1️⃣ **Xəbər göndərin:**
+🎯 Addım-addım təlimat:
+
+1️⃣ Xəbər göndərin:
    • Mətn yazın və ya yapışdırın
    • Link göndərin
    • Şəkil yükləyin
 
-2️⃣ **Analizi gözləyin:**
+2️⃣ Analizi gözləyin:
    • Bot xəbəri analiz edəcək (30-60 saniyə)
    • Müxtəlif mənbələrlə yoxlayacaq
 
-3️⃣ **Nəticəni oxuyun:**
+3️⃣ Nəticəni oxuyun:
    • Etibarlılıq xalı (0-10)
    • Təfərrüatlı analiz
    • Tövsiyələr
 
-💡 **Tövsiyələr:**
+💡 Tövsiyələr:
 • Uzun mətnlər daha yaxşı analiz olunur
 • Rəsmi mənbələr üstünlük təşkil edir
 • Şübhəli xəbərləri paylaşmayın"""
+
+DETAILED_HELP_TEXT = """📋 Ətraflı Təlimat
+
+🔍 Analiz Prosesi:
+Bot aşağıdaki addımları izləyir:
+1. Mətn təmizləmə və normallaşdırma
+2. Mənbə identifikasiyası
+3. Rəsmi mənbələrlə yoxlama
+4. AI ilə məzmun analizi
+5. Etibarlılıq hesablama
+
+📊 Qiymətləndirmə Kriteyaları:
+• Mənbə etibarlılığı (35%): Rəsmi mənbələr, tanınmış KİV
+• Məzmun keyfiyyəti (25%): Struktur, dil keyfiyyəti
+• Dil istifadəsi (20%): Bitərəflik, manipulyasiya
+• Faktiki doğrulama (15%): Digər mənbələrlə uyğunluq
+• Aktualıq (5%): Zaman uyğunluğu
+
+⚠️ Məhdudiyyətlər:
+• AI sistemi 100% dəqiq deyil
+• Həmişə digər mənbələrlə də yoxlayın
+• Şübhəli xəbərləri paylaşmayın"""
+
+class UserInteraction:
+    def __init__(self):
+        pass
+    
+    @staticmethod
+    async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show main interaction menu"""
+        await update.message.reply_text(MAIN_MENU_TEXT, reply_markup=_MAIN_KB)
+    
+    @staticmethod
+    async def show_analysis_options(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show analysis type options"""
+        await update.message.reply_text(ANALYSIS_OPTIONS_TEXT, reply_markup=_ANALYSIS_OPTIONS_KB)
+    
+    @staticmethod
+    async def show_user_stats_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show user statistics menu"""
+        user_id = update.effective_user.id
         
-        keyboard = [
-            [InlineKeyboardButton("📰 İndi Sınayın", callback_data="analysis_text")],
-            [InlineKeyboardButton("🔙 Əsas Menyu", callback_data="back_to_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text(tutorial_text, reply_markup=reply_markup, parse_mode='Markdown')
+        try:
+            user_stats = await run_db(get_db().get_user_stats, user_id)
+            # The history generator reads from the cursor, so drain it on the worker
+            user_history = await run_db(lambda: list(get_db().get_user_history(user_id, limit=5)))
+            
+            if user_stats:
+                lines = [
+                    _md_bold("📊 Sizin Statistikalarınız"),
+                    "",
+                    _md(f"🔢 Ümumi analizlər: {user_stats['total_analyses']}"),
+                    _md(f"📅 İlk analiz: {user_stats['first_analysis_date']}"),
+                    _md(f"📅 Son analiz: {user_stats['last_analysis_date']}"),
+                    _md(f"⭐ Orta etibarlılıq xalı: {user_stats.get('average_credibility_score', 0):.1f}"),
+                    "",
+                    _md_bold("📋 Son 5 Analiz:")
+                ]
+                
+                for i, analysis in enumerate(user_history, 1):
+                    lines.append(_md(f"{i}. {analysis['news_type']} - {analysis['credibility_score']}/10"))
+                
+                stats_text = "\n".join(lines)
+                reply_markup = _STATS_KB
+            else:
+                stats_text = "\n".join([
+                    _md_bold("📊 Sizin Statistikalarınız"),
+                    "",
+                    _md("🔢 Hələ heç bir analiz etməmisiniz."),
+                    _md('💡 İlk xəbərinizi analiz etmək üçün "📰 Xəbər Analizi" seçin!')
+                ])
+                reply_markup = _FIRST_ANALYSIS_KB
+            
+            await update.message.reply_text(stats_text, reply_markup=reply_markup, parse_mode='MarkdownV2')
+            
+        except Exception as e:
+            logger.error("Error showing user stats: %s", e)
+            await update.message.reply_text("❌ Statistikalarınızı yükləməkdə xəta baş verdi.")
+    
+    @staticmethod
+    async def show_help_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show help menu"""
+        await update.message.reply_text(HELP_TEXT, reply_markup=_HELP_KB)
+    
+    @staticmethod
+    async def show_settings_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show settings menu"""
+        await update.message.reply_text(SETTINGS_TEXT, reply_markup=_BACK_MAIN_KB)
+    
+    @staticmethod
+    async def show_tutorial(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show tutorial"""
+        await update.message.reply_text(TUTORIAL_TEXT, reply_markup=_TUTORIAL_KB)
     
     @staticmethod
     async def handle_text_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -217,95 +283,45 @@ Gələcək versiyalarda əlavə seçimlər əlavə ediləcək."""
         callback_data = query.data
         
         if callback_data == "back_to_menu":
-            # Edit the message to show main menu text
-            await query.edit_message_text(
-                "🎯 **Əsas Menyu**\n\n"
-                "Aşağıdakı düymələrdən birini seçin və ya mətn yazın:",
-                parse_mode='Markdown'
-            )
-            # Show main menu
-            await UserInteraction.show_main_menu(query, context)
-        
-        elif callback_data == "analysis_text":
-            await query.edit_message_text(
-                "📝 **Mətn Analizi**\n\n"
-                "Zəhmət olmasa analiz etmək istədiyiniz xəbər mətnini yazın:",
-                parse_mode='Markdown'
-            )
-        
-        elif callback_data == "analysis_link":
-            await query.edit_message_text(
-                "🔗 **Link Analizi**\n\n"
-                "Zəhmət olmasa analiz etmək istədiyiniz xəbər linkini göndərin:",
-                parse_mode='Markdown'
-            )
+            # The persistent main keyboard is still shown, so only edit the card
+            await query.edit_message_text(BACK_TO_MENU_TEXT)
         
-        elif callback_data == "analysis_image":
-            await query.edit_message_text(
-                "🖼️ **Şəkil Analizi**\n\n"
-                "Zəhmət olmasa analiz etmək istədiyiniz xəbər şəklini göndərin:",
-                parse_mode='Markdown'
-            )
+        elif callback_data in ANALYSIS_PROMPTS:
+            await query.edit_message_text(ANALYSIS_PROMPTS[callback_data])
         
         elif callback_data == "detailed_stats":
             user_id = query.from_user.id
             try:
-                user_stats = db.get_user_stats(user_id)
-                user_history = db.get_user_history(user_id, limit=10)
+                user_stats = await run_db(get_db().get_user_stats, user_id)
+                user_history = await run_db(lambda: list(get_db().get_user_history(user_id, limit=10)))
                 
                 if user_stats:
-                    detailed_text = f"""📈 **Ətraflı Statistika**
-
-👤 **İstifadəçi:** {user_id}
-🔢 **Ümumi analizlər:** {user_stats['total_analyses']}
-📅 **İlk analiz tarixi:** {user_stats['first_analysis_date']}
-📅 **Son analiz tarixi:** {user_stats['last_analysis_date']}
-⭐ **Orta etibarlılıq xalı:** {user_stats.get('average_credibility_score', 0):.2f}
-
-📊 **Son 10 Analiz:**"""
+                    lines = [
+                        _md_bold("📈 Ətraflı Statistika"),
+                        "",
+                        f"👤 {_md_bold('İstifadəçi:')} {_md(user_id)}",
+                        f"🔢 {_md_bold('Ümumi analizlər:')} {_md(user_stats['total_analyses'])}",
+                        f"📅 {_md_bold('İlk analiz tarixi:')} {_md(user_stats['first_analysis_date'])}",
+                        f"📅 {_md_bold('Son analiz tarixi:')} {_md(user_stats['last_analysis_date'])}",
+                        f"⭐ {_md_bold('Orta etibarlılıq xalı:')} {_md(format(user_stats.get('average_credibility_score', 0), '.2f'))}",
+                        "",
+                        _md_bold("📊 Son 10 Analiz:")
+                    ]
                     
                     for i, analysis in enumerate(user_history, 1):
-                        detailed_text += f"\n{i}. {analysis['analyzed_date'][:10]} - {analysis['news_type']} ({analysis['credibility_score']}/10)"
-                    
-                    keyboard = [[InlineKeyboardButton("🔙 Geri", callback_data="back_to_menu")]]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
+                        lines.append(_md(f"{i}. {format_timestamp(analysis['analyzed_date'], '%Y-%m-%d')} - {analysis['news_type']} ({analysis['credibility_score']}/10)"))
                     
-                    await query.edit_message_text(detailed_text, reply_markup=reply_markup, parse_mode='Markdown')
+                    await query.edit_message_text("\n".join(lines), reply_markup=_BACK_KB, parse_mode='MarkdownV2')
                 else:
                     await query.edit_message_text("❌ Statistika məlumatı tapılmadı.")
             except Exception as e:
-                logger.error(f"Error showing detailed stats: {e}")
+                logger.error("Error showing detailed stats: %s", e)
                 await query.edit_message_text("❌ Ətraflı statistika yükləməkdə xəta.")
         
         elif callback_data == "detailed_help":
-            detailed_help = """📋 **Ətraflı Təlimat**
-
-🔍 **Analiz Prosesi:**
-Bot aşağıdaki addımları izləyir:
-1. Mətn təmizləmə və normallaşdırma
-2. Mənbə identifikasiyası
-3. Rəsmi mənbələrlə yoxlama
-4. AI ilə məzmun analizi
-5. Etibarlılıq hesablama
-
-📊 **Qiymətləndirmə Kriteyaları:**
-• **Mənbə etibarlılığı (35%):** Rəsmi mənbələr, tanınmış KİV
-• **Məzmun keyfiyyəti (25%):** Struktur, dil keyfiyyəti
-• **Dil istifadəsi (20%):** Bitərəflik, manipulyasiya
-• **Faktiki doğrulama (15%):** Digər mənbələrlə uyğunluq
-• **Aktualıq (5%):** Zaman uyğunluğu
-
-⚠️ **Məhdudiyyətlər:**
-• AI sistemi 100% dəqiq deyil
-• Həmişə digər mənbələrlə də yoxlayın
-• Şübhəli xəbərləri paylaşmayın"""
-            
-            keyboard = [[InlineKeyboardButton("🔙 Geri", callback_data="back_to_menu")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(detailed_help, reply_markup=reply_markup, parse_mode='Markdown')
+            await query.edit_message_text(DETAILED_HELP_TEXT, reply_markup=_BACK_KB)
         
         else:
             # Unknown callback, go back to menu
             await query.edit_message_text("❌ Naməlum seçim. Əsas menyuya qayıdılır...")
-            await UserInteraction.show_main_menu(query, context) 
\ No newline at end of file
+            await UserInteraction.show_main_menu(query, context)
\ No newline at end of file
@@ -8,6 +8,15 @@ This module contains:
 - Feature flags and constants
 """
 
-from .settings import config, Config
+from .settings import Config
+
+
+def __getattr__(name):
+    # Defer building the global config until it is actually used
+    if name == 'config':
+        from . import settings
+        return settings.config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['config', 'Config'] 
\ No newline at end of file
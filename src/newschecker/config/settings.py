@@ -49,6 +49,7 @@ class Config:
         # Performance configurations
         self.ENABLE_PERFORMANCE_MONITORING = os.getenv('ENABLE_PERFORMANCE_MONITORING', 'true').lower() == 'true'
         self.METRICS_COLLECTION_INTERVAL = int(os.getenv('METRICS_COLLECTION_INTERVAL', '300'))  # 5 minutes
+        self.ENABLE_UVLOOP = os.getenv('ENABLE_UVLOOP', 'true').lower() == 'true'  # Used when uvloop is installed
         
         # Feature flags
         self.ENABLE_CACHING = os.getenv('ENABLE_CACHING', 'true').lower() == 'true'
@@ -122,13 +123,18 @@ class Config:
             issues.append("RATE_LIMIT_WINDOW must be positive")
         
         if issues:
-            logging.error(f"Configuration validation failed: {'; '.join(issues)}")
+            logging.error("Configuration validation failed: %s", '; '.join(issues))
             return False
         
         return True
 
-# Create global config instance
-config = Config()
+def __getattr__(name: str) -> Any:
+    """Create the global config instance lazily on first access."""
+    if name == 'config':
+        global config
+        config = Config()
+        return config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # News Sources Configuration
 NEWS_SOURCES = [
@@ -187,11 +193,15 @@ def sanitize_input(text: str, max_length: Optional[int] = None) -> str:
     if not text:
         return ""
     
-    # Remove null bytes and control characters
-    text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\r\t')
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    # Fast path: short printable text without whitespace runs is already clean
+    if len(text) <= 128 and text.isprintable() and '  ' not in text:
+        text = text.strip()
+    else:
+        # Remove null bytes and control characters
+        text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\r\t')
+
+        # Remove excessive whitespace
+        text = re.sub(r'\s+', ' ', text).strip()
     
     # Limit length if specified
     if max_length and len(text) > max_length:
@@ -1,7 +1,162 @@
 import re
 import logging
-from typing import Dict, List, Any, Optional
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Set, FrozenSet, Tuple, Callable, Iterable, Iterator, Match
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional
+    ahocorasick = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional
+    njit = None
+
+# Factual indicator patterns shared by all analyzer instances
+_YEAR_RE = re.compile(r'\d{4}')
+_PERCENT_RE = re.compile(r'\d+[%‰]')
+_MONEY_RE = re.compile(r'\$\d+|\d+\s*(dollar|manat|azn)', re.IGNORECASE)
+_CAPS_RE = re.compile(r'\b[A-Z]{3,}\b')
+
+# Word-bounded alternation of plain phrases, e.g. r'\b(cover-up|ört-basdır)\b'
+_LITERAL_PATTERN_RE = re.compile(r'\\b\((.*)\)\\b')
+_REGEX_METACHARS = frozenset('\\.^$*+?{}[]()')
+
+# Folds the case variants re.IGNORECASE treats as equal (ı/i, ſ/s and the
+# combining dot left by lowercasing İ) so substring checks on lowercased
+# text never miss a phrase the regex would match
+_CASE_FOLD = str.maketrans({'ı': 'i', 'ſ': 's', '\u0307': None})
+
+def _literal_alternatives(pattern: str) -> Optional[List[str]]:
+    """Return the plain phrases of a word-bounded literal pattern, or None."""
+    match = _LITERAL_PATTERN_RE.fullmatch(pattern)
+    if match is None:
+        return None
+    alternatives = match.group(1).replace("\\'", "'").split('|')
+    if any(char in _REGEX_METACHARS for alternative in alternatives for char in alternative):
+        return None
+    return alternatives
+
+def _sources_key(sources: Iterable[Dict[str, Any]]) -> Tuple[Tuple[Any, Any], ...]:
+    """Reduce search result records to the fields the analyzer reads."""
+    return tuple((source.get('link', ''), source.get('snippet', '')) for source in sources)
+
+@functools.lru_cache(maxsize=1024)
+def _snippet_tokens(snippet: str) -> FrozenSet[str]:
+    """Lowercased token set of a search result snippet."""
+    return frozenset(snippet.lower().split())
+
+def _copy_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an analysis dict so callers cannot mutate a cached result."""
+    return {key: list(value) if isinstance(value, list) else value for key, value in analysis.items()}
+
+# Component scores in the same order as the weight vector
+_SCORE_KEYS = ('source_score', 'content_score', 'factual_score', 'language_score', 'temporal_score')
+_WEIGHT_KEYS = ('source_credibility', 'content_quality', 'factual_indicators',
+                'language_analysis', 'temporal_relevance')
+
+# Warning flag emitted for each matched warning pattern category
+_CATEGORY_FLAGS = {
+    'sensational_language': '⚠️ Sensasiyalı dil istifadə edilib',
+    'emotional_manipulation': '⚠️ Emosional manipulyasiya əlamətləri',
+    'unverified_claims': '⚠️ Təsdiqlənməmiş iddialar',
+    'conspiracy_indicators': '⚠️ Sui-qəsd nəzəriyyəsi əlamətləri'
+}
+
+# Content shorter than this is too short to analyze meaningfully
+_MIN_CONTENT_LENGTH = 50
+
+def _is_too_short(content: str) -> bool:
+    """Check whether content is empty or below the minimum analyzable length."""
+    return not content or len(content) < _MIN_CONTENT_LENGTH
+
+# Credibility levels from lowest to highest, indexed by threshold bucket
+_CREDIBILITY_LEVELS = ('Şübhəli', 'Aşağı Etibarlı', 'Orta Etibarlı', 'Yüksək Etibarlı')
+
+# Score-based warnings as (component score, upper limit, flag); bit i of the
+# scoring kernel's flag mask is set when warning i applies
+_SCORE_WARNINGS = (
+    ('language_score', 5.0, '⚠️ Sensasiya dili və ya qərəzli ifadələr aşkar edildi'),
+    ('source_score', 4.0, '⚠️ Mənbələr kifayət qədər etibarlı deyil'),
+    ('content_score', 4.0, '⚠️ Məzmun keyfiyyəti aşağıdır'),
+    ('factual_score', 4.0, '⚠️ Faktiki məlumatlar təsdiq edilməyib')
+)
+_WARNING_COLUMNS = np.array([_SCORE_KEYS.index(key) for key, _, _ in _SCORE_WARNINGS], dtype=np.int64)
+_WARNING_LIMITS = np.array([limit for _, limit, _ in _SCORE_WARNINGS], dtype=np.float64)
+
+def _score_kernel_loops(scores, weights, bins, warning_columns, warning_limits):
+    """
+    Score an (N, 5) matrix of component scores row by row.
+    
+    Returns the final scores, the credibility level index of each row and a
+    bitmask of the score-based warnings that apply. Written as plain loops
+    so numba can compile it.
+    """
+    count = scores.shape[0]
+    finals = np.empty(count, dtype=np.float64)
+    levels = np.empty(count, dtype=np.int64)
+    flag_bits = np.empty(count, dtype=np.int64)
+    for i in range(count):
+        total = 0.0
+        for j in range(weights.shape[0]):
+            total += scores[i, j] * weights[j]
+        finals[i] = total
+        
+        level = 0
+        for b in range(bins.shape[0]):
+            if total >= bins[b]:
+                level = b + 1
+        levels[i] = level
+        
+        mask = 0
+        for k in range(warning_columns.shape[0]):
+            if scores[i, warning_columns[k]] < warning_limits[k]:
+                mask |= 1 << k
+        flag_bits[i] = mask
+    return finals, levels, flag_bits
+
+def _score_kernel_numpy(scores, weights, bins, warning_columns, warning_limits):
+    """Vectorized equivalent of _score_kernel_loops used when numba is unavailable."""
+    finals = (scores * weights).sum(axis=1)
+    levels = np.digitize(finals, bins)
+    below = scores[:, warning_columns] < warning_limits
+    flag_bits = (below * (1 << np.arange(warning_columns.shape[0]))).sum(axis=1)
+    return finals, levels, flag_bits
+
+_score_kernel = _score_kernel_numpy
+if njit is not None:
+    try:
+        # Compile (or load the cached build) at import rather than on first analysis
+        _jit_kernel = njit(cache=True)(_score_kernel_loops)
+        _jit_kernel(np.full((1, len(_SCORE_KEYS)), 5.0), np.full(len(_SCORE_KEYS), 0.2),
+                    np.array([2.5, 5.0, 7.5]), _WARNING_COLUMNS, _WARNING_LIMITS)
+        _score_kernel = _jit_kernel
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"numba scoring kernel unavailable, using numpy: {e}")
+
+def _build_substring_matcher(needles: Iterable[str]) -> Callable[[str], bool]:
+    """
+    Build a single-pass matcher reporting whether any needle occurs in a text.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed and a
+    compiled alternation of the escaped needles otherwise.
+    """
+    needles = list(needles)
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+    
+    pattern = re.compile('|'.join(re.escape(needle) for needle in needles))
+    return lambda text: pattern.search(text) is not None
 
 class CredibilityAnalyzer:
     """
@@ -15,6 +170,13 @@ class CredibilityAnalyzer:
     - Temporal relevance
     """
     
+    __slots__ = (
+        'logger', 'weights', '_weights_vec', 'credibility_thresholds', '_level_bins',
+        'warning_patterns', '_warning_group_types', '_warning_scanners', 'trusted_indicators',
+        '_trusted_matcher', '_mentioned_res',
+        'quality_indicators', '_quality_count', '_quality_re', '_analyze_cached'
+    )
+    
     def __init__(self):
         """Initialize the credibility analyzer with scoring parameters."""
         self.logger = logging.getLogger(__name__)
@@ -27,6 +189,7 @@ class CredibilityAnalyzer:
             'language_analysis': 0.15,       # 15% - Language patterns and bias
             'temporal_relevance': 0.10       # 10% - Recency and relevance
         }
+        self._weights_vec = np.array([self.weights[key] for key in _WEIGHT_KEYS], dtype=np.float64)
         
         # Credibility thresholds
         self.credibility_thresholds = {
@@ -34,6 +197,11 @@ class CredibilityAnalyzer:
             'medium': 5.0,
             'low': 2.5
         }
+        self._level_bins = np.array([
+            self.credibility_thresholds['low'],
+            self.credibility_thresholds['medium'],
+            self.credibility_thresholds['high']
+        ], dtype=np.float64)
         
         # Warning flag patterns
         self.warning_patterns = {
@@ -68,15 +236,67 @@ class CredibilityAnalyzer:
             'reuters', 'ap news', 'bbc', 'dw', 'cnn', 'who.int', 'gov.az',
             'president.az', 'mfa.gov.az', 'azernews.az', 'trend.az'
         ]
+        self._trusted_matcher = _build_substring_matcher(self.trusted_indicators)
+        
+        # Mentioned source categories, one compiled alternation each; they are
+        # searched separately so a hit in one category cannot hide an
+        # overlapping hit in another (e.g. "cnnazirlik")
+        self._mentioned_res = tuple(
+            (category, re.compile('|'.join(re.escape(indicator) for indicator in indicators), re.IGNORECASE))
+            for category, indicators in (
+                ('trusted', self.trusted_indicators),
+                ('official', ('rəsmi', 'official')),
+                ('ministry', ('nazirlik', 'ministry'))
+            )
+        )
         
         # Quality indicators
         self.quality_indicators = {
             'has_date': r'\d{1,2}[./]\d{1,2}[./]\d{2,4}',
             'has_author': r'(by |tərəfindən |müəllif:)',
             'has_quotes': r'[""„"].*?[""„"]',
-            'has_statistics': r'\d+[%‰]|\d+\s*(min|max|ortalama|average)',
-            'proper_grammar': True  # Will be analyzed separately
+            'has_statistics': r'\d+[%‰]|\d+\s*(min|max|ortalama|average)'
         }
+        
+        # Warning patterns fused into one alternation per category; each
+        # pattern gets a named group so a scan can tell which one matched.
+        # Categories are scanned separately because an alternation reports
+        # only one pattern per position, and overlapping hits from different
+        # categories must all count. A category made only of word-bounded
+        # plain phrases is scanned only when one of its phrases occurs in the
+        # text, which a substring check finds far faster than the regex engine
+        self._warning_group_types = {}
+        warning_scanners = []
+        for pattern_type, patterns in self.warning_patterns.items():
+            alternatives = []
+            literals = set()
+            for pattern in patterns:
+                group_name = f'w{len(self._warning_group_types)}'
+                self._warning_group_types[group_name] = pattern_type
+                alternatives.append(f'(?P<{group_name}>{pattern})')
+                phrases = _literal_alternatives(pattern)
+                if phrases is None or literals is None:
+                    literals = None
+                else:
+                    literals.update(phrase.lower().translate(_CASE_FOLD) for phrase in phrases)
+            if alternatives:
+                warning_scanners.append((
+                    re.compile('|'.join(alternatives), re.IGNORECASE),
+                    tuple(literals) if literals is not None else None
+                ))
+        self._warning_scanners = tuple(warning_scanners)
+        
+        # Quality indicators fused into one lookahead alternation named after
+        # each indicator; lookahead matches consume nothing, so one indicator
+        # cannot hide another that starts inside it
+        self._quality_count = len(self.quality_indicators)
+        self._quality_re = re.compile(
+            '(?=' + '|'.join(f'(?P<{indicator}>{pattern})' for indicator, pattern in self.quality_indicators.items()) + ')',
+            re.IGNORECASE
+        )
+        
+        # Memoized analyses keyed by content, mentioned sources and search results
+        self._analyze_cached = functools.lru_cache(maxsize=512)(self._analyze_key)
 
     def analyze_credibility(self, content: str, search_results: Dict[str, Any], 
                           mentioned_sources: str) -> Dict[str, Any]:
@@ -91,46 +311,48 @@ class CredibilityAnalyzer:
         Returns:
             Dict containing analysis results and scores
         """
+        if _is_too_short(content):
+            return self._get_short_content_result()
+        
+        try:
+            key = (
+                content,
+                mentioned_sources,
+                _sources_key(search_results.get('news_sources', [])),
+                _sources_key(search_results.get('official_sources', []))
+            )
+            hash(key)
+        except (AttributeError, TypeError):
+            # Inputs that cannot form a cache key are analyzed directly
+            return self._analyze_uncached(content, search_results, mentioned_sources)
+        
+        return _copy_analysis(self._analyze_cached(key))
+
+    def _analyze_key(self, key: Tuple[Any, ...]) -> Dict[str, Any]:
+        """Rebuild the analyzer inputs from a cache key and analyze them."""
+        content, mentioned_sources, news_key, official_key = key
+        search_results = {
+            'news_sources': [{'link': link, 'snippet': snippet} for link, snippet in news_key],
+            'official_sources': [{'link': link, 'snippet': snippet} for link, snippet in official_key]
+        }
+        return self._analyze_uncached(content, search_results, mentioned_sources)
+
+    def _analyze_uncached(self, content: str, search_results: Dict[str, Any],
+                          mentioned_sources: str) -> Dict[str, Any]:
+        """Run the full credibility analysis without consulting the cache."""
         try:
             self.logger.debug("Starting credibility analysis")
             
-            # Initialize analysis results
-            analysis = {
-                'source_score': 0.0,
-                'content_score': 0.0,
-                'factual_score': 0.0,
-                'language_score': 0.0,
-                'temporal_score': 0.0,
-                'final_score': 0.0,
-                'credibility_level': 'unknown',
-                'warning_flags': [],
-                'positive_indicators': [],
-                'recommendations': []
-            }
-            
-            # Analyze each component
-            analysis['source_score'] = self._analyze_source_credibility(search_results, mentioned_sources)
-            analysis['content_score'] = self._analyze_content_quality(content)
-            analysis['factual_score'] = self._analyze_factual_indicators(content, search_results)
-            analysis['language_score'] = self._analyze_language_patterns(content)
-            analysis['temporal_score'] = self._analyze_temporal_relevance(search_results)
-            
-            # Calculate final weighted score
-            analysis['final_score'] = (
-                analysis['source_score'] * self.weights['source_credibility'] +
-                analysis['content_score'] * self.weights['content_quality'] +
-                analysis['factual_score'] * self.weights['factual_indicators'] +
-                analysis['language_score'] * self.weights['language_analysis'] +
-                analysis['temporal_score'] * self.weights['temporal_relevance']
-            )
+            analysis = self._analyze_components(content, search_results, mentioned_sources)
             
-            # Determine credibility level
-            analysis['credibility_level'] = self._determine_credibility_level(analysis['final_score'])
+            # Calculate final weighted score and credibility level
+            scores = np.array([[analysis[key] for key in _SCORE_KEYS]], dtype=np.float64)
+            finals, level_indexes, flag_bits = self._score(scores)
+            analysis['final_score'] = float(finals[0])
+            analysis['credibility_level'] = _CREDIBILITY_LEVELS[level_indexes[0]]
+            analysis['_score_flags'] = int(flag_bits[0])
             
-            # Generate warning flags and recommendations
-            analysis['warning_flags'] = self._generate_warning_flags(content, analysis)
-            analysis['positive_indicators'] = self._generate_positive_indicators(content, search_results, analysis)
-            analysis['recommendations'] = self._generate_recommendations(analysis)
+            self._complete_analysis(analysis, content, search_results)
             
             self.logger.debug(f"Credibility analysis completed. Final score: {analysis['final_score']:.2f}")
             return analysis
@@ -139,6 +361,138 @@ class CredibilityAnalyzer:
             self.logger.error(f"Error in credibility analysis: {e}")
             return self._get_default_analysis()
 
+    def analyze_many(self, items: List[Tuple[str, Dict[str, Any], str]],
+                     max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Perform credibility analysis for a batch of news items.
+        
+        Component scores are computed per item, while final scores and
+        credibility levels are computed for the whole batch at once.
+        
+        Args:
+            items: (content, search_results, mentioned_sources) tuples
+            max_workers: Number of threads to split component analysis over;
+                None or 1 analyzes the batch in the calling thread
+            
+        Returns:
+            Analysis dicts in the same order as the input items
+        """
+        if max_workers and max_workers > 1 and len(items) > 1:
+            chunk_size = -(-len(items) // max_workers)
+            chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                results = [analysis for chunk in executor.map(self._analyze_chunk, chunks) for analysis in chunk]
+        else:
+            results = self._analyze_chunk(items)
+        
+        scored = [i for i, analysis in enumerate(results) if analysis is not None]
+        if scored:
+            scores = np.empty((len(scored), len(_SCORE_KEYS)), dtype=np.float64)
+            for row, i in enumerate(scored):
+                scores[row] = [results[i][key] for key in _SCORE_KEYS]
+            finals, level_indexes, flag_bits = self._score(scores)
+            
+            for row, i in enumerate(scored):
+                content, search_results, _ = items[i]
+                analysis = results[i]
+                try:
+                    analysis['final_score'] = float(finals[row])
+                    analysis['credibility_level'] = _CREDIBILITY_LEVELS[level_indexes[row]]
+                    analysis['_score_flags'] = int(flag_bits[row])
+                    self._complete_analysis(analysis, content, search_results)
+                except Exception as e:
+                    self.logger.error(f"Error in credibility analysis: {e}")
+                    results[i] = None
+        
+        self.logger.debug(f"Batch credibility analysis completed for {len(items)} items")
+        return [
+            analysis if analysis is not None
+            else self._get_short_content_result() if _is_too_short(item[0])
+            else self._get_default_analysis()
+            for analysis, item in zip(results, items)
+        ]
+
+    def _analyze_chunk(self, items: List[Tuple[str, Dict[str, Any], str]]) -> List[Optional[Dict[str, Any]]]:
+        """Compute component scores for a slice of a batch; short or failed items become None."""
+        results = []
+        for content, search_results, mentioned_sources in items:
+            if _is_too_short(content):
+                results.append(None)
+                continue
+            try:
+                results.append(self._analyze_components(content, search_results, mentioned_sources))
+            except Exception as e:
+                self.logger.error(f"Error in credibility analysis: {e}")
+                results.append(None)
+        return results
+
+    def _score(self, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score an (N, 5) matrix of component scores with the scoring kernel.
+        
+        Rows are scored independently so a result does not depend on the
+        size of the batch it was computed in.
+        
+        Returns:
+            Final scores, credibility level indexes and score warning bitmasks
+        """
+        return _score_kernel(scores, self._weights_vec, self._level_bins, _WARNING_COLUMNS, _WARNING_LIMITS)
+
+    def _analyze_components(self, content: str, search_results: Dict[str, Any],
+                            mentioned_sources: str) -> Dict[str, Any]:
+        """Compute the component scores of a single analysis."""
+        # Initialize analysis results
+        analysis = {
+            'source_score': 0.0,
+            'content_score': 0.0,
+            'factual_score': 0.0,
+            'language_score': 0.0,
+            'temporal_score': 0.0,
+            'final_score': 0.0,
+            'credibility_level': 'unknown',
+            'warning_flags': [],
+            'positive_indicators': [],
+            'recommendations': []
+        }
+        
+        # Derive content features once for all components
+        features = self._extract_content_features(content)
+        
+        # Analyze each component
+        analysis['source_score'] = self._analyze_source_credibility(search_results, mentioned_sources)
+        analysis['content_score'] = self._analyze_content_quality(features)
+        analysis['factual_score'] = self._analyze_factual_indicators(features, search_results)
+        analysis['language_score'], analysis['_matched_categories'] = self._analyze_language_patterns(features)
+        analysis['temporal_score'] = self._analyze_temporal_relevance(search_results)
+        
+        return analysis
+
+    def _complete_analysis(self, analysis: Dict[str, Any], content: str, search_results: Dict[str, Any]):
+        """Add warning flags, positive indicators and recommendations to a scored analysis."""
+        analysis['warning_flags'] = self._generate_warning_flags(content, analysis)
+        del analysis['_matched_categories']
+        del analysis['_score_flags']
+        analysis['positive_indicators'] = self._generate_positive_indicators(content, search_results, analysis)
+        analysis['recommendations'] = self._generate_recommendations(analysis)
+
+    def _extract_content_features(self, content: str) -> Dict[str, Any]:
+        """Compute the content features shared by the analysis components."""
+        content_lower = content.lower()
+        return {
+            'text': content,
+            'lower': content_lower,
+            'folded': content_lower.translate(_CASE_FOLD),
+            'tokens': frozenset(content_lower.split()),
+            'period_count': content.count('.'),
+            'has_newline': '\n' in content,
+            'exclamation_count': content.count('!'),
+            # Lowercase-only text cannot contain ALL CAPS words
+            'caps_count': sum(1 for _ in _CAPS_RE.finditer(content)) if content_lower != content else 0,
+            'has_year': _YEAR_RE.search(content) is not None,
+            'has_percent': _PERCENT_RE.search(content) is not None,
+            'has_money': _MONEY_RE.search(content) is not None
+        }
+
     def _analyze_source_credibility(self, search_results: Dict[str, Any], mentioned_sources: str) -> float:
         """Analyze credibility based on sources."""
         score = 5.0  # Base score
@@ -157,7 +511,7 @@ class CredibilityAnalyzer:
                 trusted_count = 0
                 for source in news_sources:
                     url = source.get('link', '').lower()
-                    if any(trusted in url for trusted in self.trusted_indicators):
+                    if self._trusted_matcher(url):
                         trusted_count += 1
                 
                 if trusted_count > 0:
@@ -168,7 +522,10 @@ class CredibilityAnalyzer:
                 for source in news_sources:
                     url = source.get('link', '')
                     if url:
-                        domain = url.split('/')[2] if len(url.split('/')) > 2 else url
+                        try:
+                            domain = urlsplit(url).hostname or url
+                        except ValueError:
+                            domain = url  # Malformed link, e.g. an unclosed IPv6 bracket
                         unique_domains.add(domain)
                 
                 if len(unique_domains) > 1:
@@ -176,13 +533,15 @@ class CredibilityAnalyzer:
             
             # Analyze mentioned sources
             if mentioned_sources:
-                if any(indicator in mentioned_sources.lower() for indicator in self.trusted_indicators):
+                hits = {category for category, pattern in self._mentioned_res if pattern.search(mentioned_sources)}
+                
+                if 'trusted' in hits:
                     score += 1.0
                 
                 # Check for specific source types
-                if 'rəsmi' in mentioned_sources.lower() or 'official' in mentioned_sources.lower():
+                if 'official' in hits:
                     score += 0.5
-                if 'nazirlik' in mentioned_sources.lower() or 'ministry' in mentioned_sources.lower():
+                if 'ministry' in hits:
                     score += 0.5
             
             return min(score, 10.0)
@@ -191,11 +550,13 @@ class CredibilityAnalyzer:
             self.logger.error(f"Error in source credibility analysis: {e}")
             return 5.0
 
-    def _analyze_content_quality(self, content: str) -> float:
+    def _analyze_content_quality(self, features: Dict[str, Any]) -> float:
         """Analyze content quality indicators."""
         score = 5.0  # Base score
         
         try:
+            content = features['text']
+            
             # Length analysis
             if len(content) > 200:
                 score += 0.5
@@ -203,21 +564,20 @@ class CredibilityAnalyzer:
                 score += 0.5
             
             # Structure analysis
-            sentences = content.split('.')
-            if len(sentences) > 3:
+            if features['period_count'] >= 3:  # More than three sentences
                 score += 0.5
             
             # Check for quality indicators
-            for indicator, pattern in self.quality_indicators.items():
-                if indicator == 'proper_grammar':
-                    continue  # Skip for now
-                
-                if re.search(pattern, content, re.IGNORECASE):
-                    score += 0.3
+            matched_indicators = set()
+            for match in self._quality_re.finditer(content):
+                matched_indicators.add(match.lastgroup)
+                if len(matched_indicators) == self._quality_count:
+                    break
+            for _ in matched_indicators:
+                score += 0.3
             
             # Paragraph structure
-            paragraphs = content.split('\n')
-            if len(paragraphs) > 1:
+            if features['has_newline']:  # More than one paragraph
                 score += 0.3
             
             # Check for proper capitalization
@@ -230,43 +590,43 @@ class CredibilityAnalyzer:
             self.logger.error(f"Error in content quality analysis: {e}")
             return 5.0
 
-    def _analyze_factual_indicators(self, content: str, search_results: Dict[str, Any]) -> float:
+    def _analyze_factual_indicators(self, features: Dict[str, Any], search_results: Dict[str, Any]) -> float:
         """Analyze factual indicators and verification."""
         score = 5.0  # Base score
         
         try:
             # Check for specific facts, dates, numbers
-            if re.search(r'\d{4}', content):  # Years
+            if features['has_year']:  # Years
                 score += 0.5
-            if re.search(r'\d+[%‰]', content):  # Percentages
+            if features['has_percent']:  # Percentages
                 score += 0.3
-            if re.search(r'\$\d+|\d+\s*(dollar|manat|azn)', content, re.IGNORECASE):  # Money amounts
+            if features['has_money']:  # Money amounts
                 score += 0.3
             
             # Cross-reference with search results
             official_sources = search_results.get('official_sources', [])
             news_sources = search_results.get('news_sources', [])
             
+            content_tokens = features['tokens']
+            
             if official_sources:
                 # Check if content aligns with official sources
-                content_lower = content.lower()
                 for source in official_sources[:3]:  # Check top 3
-                    snippet = source.get('snippet', '').lower()
+                    snippet = source.get('snippet', '')
                     if snippet:
                         # Simple similarity check
-                        common_words = set(content_lower.split()) & set(snippet.split())
+                        common_words = content_tokens & _snippet_tokens(snippet)
                         if len(common_words) > 5:
                             score += 0.5
             
             if news_sources:
                 # Check consistency across multiple news sources
                 consistent_reports = 0
-                content_lower = content.lower()
                 
                 for source in news_sources[:5]:  # Check top 5
-                    snippet = source.get('snippet', '').lower()
+                    snippet = source.get('snippet', '')
                     if snippet:
-                        common_words = set(content_lower.split()) & set(snippet.split())
+                        common_words = content_tokens & _snippet_tokens(snippet)
                         if len(common_words) > 3:
                             consistent_reports += 1
                 
@@ -279,39 +639,54 @@ class CredibilityAnalyzer:
             self.logger.error(f"Error in factual indicators analysis: {e}")
             return 5.0
 
-    def _analyze_language_patterns(self, content: str) -> float:
-        """Analyze language patterns for bias and sensationalism."""
+    def _analyze_language_patterns(self, features: Dict[str, Any]) -> Tuple[float, Set[str]]:
+        """
+        Analyze language patterns for bias and sensationalism.
+        
+        Returns:
+            Language score and the set of warning categories that matched
+        """
         score = 8.0  # Start with high score, deduct for issues
+        matched_categories = set()
         
         try:
-            content_lower = content.lower()
+            content_lower = features['lower']
             
             # Check for warning patterns
-            for pattern_type, patterns in self.warning_patterns.items():
-                for pattern in patterns:
-                    matches = re.findall(pattern, content, re.IGNORECASE)
-                    if matches:
-                        score -= min(len(matches) * 0.5, 2.0)
+            match_counts = {}
+            for match in self._warning_matches(features):
+                match_counts[match.lastgroup] = match_counts.get(match.lastgroup, 0) + 1
+            for group_name, count in match_counts.items():
+                score -= min(count * 0.5, 2.0)
+                matched_categories.add(self._warning_group_types[group_name])
             
             # Check for excessive punctuation
-            exclamation_count = content.count('!')
+            exclamation_count = features['exclamation_count']
             if exclamation_count > 3:
                 score -= min(exclamation_count * 0.2, 1.5)
             
             # Check for ALL CAPS (indicates shouting)
-            caps_words = re.findall(r'\b[A-Z]{3,}\b', content)
-            if len(caps_words) > 2:
-                score -= min(len(caps_words) * 0.1, 1.0)
+            caps_count = features['caps_count']
+            if caps_count > 2:
+                score -= min(caps_count * 0.1, 1.0)
             
             # Check for balanced language
             if any(word in content_lower for word in ['however', 'although', 'but', 'lakin', 'ancaq']):
                 score += 0.3  # Bonus for balanced language
             
-            return max(score, 0.0)
+            return max(score, 0.0), matched_categories
             
         except Exception as e:
             self.logger.error(f"Error in language pattern analysis: {e}")
-            return 6.0
+            return 6.0, matched_categories
+
+    def _warning_matches(self, features: Dict[str, Any]) -> Iterator[Match[str]]:
+        """Yield warning pattern matches, skipping categories whose phrases do not occur."""
+        content = features['text']
+        folded = features['folded']
+        for pattern_re, literals in self._warning_scanners:
+            if literals is None or any(literal in folded for literal in literals):
+                yield from pattern_re.finditer(content)
 
     def _analyze_temporal_relevance(self, search_results: Dict[str, Any]) -> float:
         """Analyze temporal relevance and recency."""
@@ -340,54 +715,25 @@ class CredibilityAnalyzer:
             self.logger.error(f"Error in temporal relevance analysis: {e}")
             return 5.0
 
-    def _determine_credibility_level(self, score: float) -> str:
-        """Determine credibility level based on score."""
-        if score >= self.credibility_thresholds['high']:
-            return 'Yüksək Etibarlı'
-        elif score >= self.credibility_thresholds['medium']:
-            return 'Orta Etibarlı'
-        elif score >= self.credibility_thresholds['low']:
-            return 'Aşağı Etibarlı'
-        else:
-            return 'Şübhəli'
-
     def _generate_warning_flags(self, content: str, analysis: Dict[str, Any]) -> List[str]:
         """Generate warning flags based on analysis."""
         flags = []
         
         try:
-            # Language-based warnings
-            if analysis['language_score'] < 5.0:
-                flags.append('⚠️ Sensasiya dili və ya qərəzli ifadələr aşkar edildi')
-            
-            # Source-based warnings
-            if analysis['source_score'] < 4.0:
-                flags.append('⚠️ Mənbələr kifayət qədər etibarlı deyil')
-            
-            # Content quality warnings
-            if analysis['content_score'] < 4.0:
-                flags.append('⚠️ Məzmun keyfiyyəti aşağıdır')
-            
-            # Factual warnings
-            if analysis['factual_score'] < 4.0:
-                flags.append('⚠️ Faktiki məlumatlar təsdiq edilməyib')
-            
-            # Check for specific warning patterns
-            content_lower = content.lower()
-            for pattern_type, patterns in self.warning_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        if pattern_type == 'sensational_language':
-                            flags.append('⚠️ Sensasiyalı dil istifadə edilib')
-                        elif pattern_type == 'emotional_manipulation':
-                            flags.append('⚠️ Emosional manipulyasiya əlamətləri')
-                        elif pattern_type == 'unverified_claims':
-                            flags.append('⚠️ Təsdiqlənməmiş iddialar')
-                        elif pattern_type == 'conspiracy_indicators':
-                            flags.append('⚠️ Sui-qəsd nəzəriyyəsi əlamətləri')
-                        break
-            
-            return list(set(flags))  # Remove duplicates
+            # Language, source, content quality and factual warnings flagged
+            # by the scoring kernel
+            score_flags = analysis['_score_flags']
+            for bit, (_, _, flag) in enumerate(_SCORE_WARNINGS):
+                if score_flags & (1 << bit):
+                    flags.append(flag)
+            
+            # Warning categories matched during the language pass
+            matched_types = analysis.get('_matched_categories', ())
+            for pattern_type, flag in _CATEGORY_FLAGS.items():
+                if pattern_type in matched_types:
+                    flags.append(flag)
+            
+            return list(dict.fromkeys(flags))  # Remove duplicates, keep order
             
         except Exception as e:
             self.logger.error(f"Error generating warning flags: {e}")
@@ -479,5 +825,20 @@ class CredibilityAnalyzer:
             'recommendations': ['💡 Digər mənbələrlə yoxlayın']
         }
 
+    def _get_short_content_result(self) -> Dict[str, Any]:
+        """Return base analysis for content too short to analyze."""
+        return {
+            'source_score': 5.0,
+            'content_score': 5.0,
+            'factual_score': 5.0,
+            'language_score': 5.0,
+            'temporal_score': 5.0,
+            'final_score': 5.0,
+            'credibility_level': 'Naməlum',
+            'warning_flags': ['⚠️ Məzmun çox qısadır'],
+            'positive_indicators': [],
+            'recommendations': ['💡 Daha ətraflı məzmun göndərin', '💡 Digər mənbələrlə yoxlayın']
+        }
+
 # Global credibility analyzer instance
 credibility_analyzer = CredibilityAnalyzer() 
\ No newline at end of file
@@ -1,11 +1,101 @@
+import functools
 import hashlib
+import heapq
 import json
+import pickle
+import sys
 import time
 import threading
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Union
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Any, Iterable, Optional, Tuple, Union
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+def _dumps_bytes(value: Any, sort_keys: bool = False) -> bytes:
+    """Serialize value to UTF-8 JSON bytes, preferring orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(value, option=option)
+        except TypeError:
+            pass  # Types orjson rejects fall back to the stdlib encoder
+    return json.dumps(value, sort_keys=sort_keys, ensure_ascii=False).encode('utf-8')
+
+# Strings shorter than this are used as keys directly instead of hashed
+_DIRECT_KEY_MAX_LENGTH = 256
+
+# Immutable values stored as they are; anything else is kept pickled
+_LIVE_VALUE_TYPES = (str, bytes, int, float, bool, type(None))
+
+# Slots of the counting fingerprint filter gating string lookups; power of two
+_FINGERPRINT_SLOTS = 1 << 16
+
+# Number of lock stripes; must be a power of two
+_SHARD_COUNT = 16
+
+# Optimistic stats reads to attempt before falling back to locking
+_STATS_READ_ATTEMPTS = 3
+
+_STATS_COUNTERS = ('hits', 'misses', 'sets', 'evictions', 'memory_usage_bytes')
+
+# Expired entries removed per set, spreading cleanup over writes
+_CLEANUP_PER_SET = 4
+
+# Seconds between background sweeps when nothing wakes the cleaner earlier
+_CLEANUP_INTERVAL = 300
+
+# Share of the memory limit at which writes wake the cleaner to evict
+_MEMORY_PRESSURE_RATIO = 0.9
+
+# Access counters are halved once any of them grows past this
+_ACCESS_COUNT_LIMIT = 2 ** 30
+
+def _estimate_size(value: Any, depth: int = 2) -> int:
+    """Estimate the in-memory size of a value, walking containers up to depth levels."""
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        for item_key, item_value in value.items():
+            size += sys.getsizeof(item_key) + _estimate_size(item_value, depth - 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _estimate_size(item, depth - 1)
+    return size
+
+@functools.lru_cache(maxsize=32)
+def _type_hash_key(cache_type: str) -> bytes:
+    """BLAKE2b key for a cache type; keys are limited to 64 bytes."""
+    type_bytes = cache_type.encode('utf-8')
+    if len(type_bytes) > 64:
+        return hashlib.blake2b(type_bytes).digest()
+    return type_bytes
+
+def _iso(timestamp: float) -> str:
+    """Format a wall-clock timestamp as local ISO 8601 time without building a datetime."""
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(timestamp))
+
+class _Entry:
+    """A cached value with its bookkeeping."""
+    
+    __slots__ = ('value', 'pickled', 'cache_type', 'created_time', 'expiry_time', 'size',
+                 'fingerprint', 'access_count')
+    
+    def __init__(self, value: Any, pickled: bool, cache_type: str, created_time: float,
+                 expiry_time: Optional[float], size: int, fingerprint: Optional[int]):
+        self.value = value
+        self.pickled = pickled
+        self.cache_type = cache_type
+        self.created_time = created_time
+        self.expiry_time = expiry_time
+        self.size = size
+        self.fingerprint = fingerprint
+        self.access_count = 0
+
 class NewsCache:
     """
     Advanced caching system for news analysis results with TTL and intelligent eviction.
@@ -13,7 +103,7 @@ class NewsCache:
     Features:
     - TTL-based expiration
     - Different cache types with different TTLs
-    - Thread-safe operations
+    - Thread-safe operations with per-shard locks
     - Memory usage tracking
     - Cache hit/miss statistics
     - Intelligent eviction policies
@@ -26,15 +116,26 @@ class NewsCache:
         Args:
             max_memory_mb: Maximum memory usage in MB
         """
-        self.cache = {}
-        self.access_times = {}
-        self.cache_stats = {
-            'hits': 0,
-            'misses': 0,
-            'sets': 0,
-            'evictions': 0,
-            'memory_usage_bytes': 0
-        }
+        # Entries are striped over shards by key hash, each with its own lock
+        # and counters, so operations on unrelated keys do not contend
+        self._shards = [
+            {
+                'cache': {},
+                # (expiry_time, key) min-heap; may hold stale pairs for
+                # entries that were replaced or removed since
+                'expiry_heap': [],
+                'lock': threading.Lock(),
+                # Odd while a writer is mutating the shard (seqlock)
+                'version': 0,
+                'type_counts': {},
+                'memory_usage_bytes': 0,
+                'hits': 0,
+                'misses': 0,
+                'sets': 0,
+                'evictions': 0
+            }
+            for _ in range(_SHARD_COUNT)
+        ]
         
         # TTL configurations (in seconds)
         self.ttl_config = {
@@ -47,107 +148,265 @@ class NewsCache:
         }
         
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
-        self.lock = threading.RLock()
         self.logger = logging.getLogger(__name__)
         
+        # Long string content is usually looked up and then stored within the
+        # same request, so remember recent digests instead of hashing twice
+        self._hashed_str_key = functools.lru_cache(maxsize=256)(self._hash_str_content)
+        
+        # Counting filter over string contents: a zero slot proves a miss
+        # before the key is built or hashed. Counters stick at 255, which
+        # only costs false positives.
+        self._fingerprints = bytearray(_FINGERPRINT_SLOTS)
+        self._fingerprint_lock = threading.Lock()
+        
+        # Typed helpers for analysis results, search results, URL content and
+        # source verifications; bound once here so each call goes straight to
+        # set/get instead of through a wrapper frame
+        self.cache_analysis = functools.partial(self.set, cache_type='analysis')
+        self.get_cached_analysis = functools.partial(self.get, cache_type='analysis')
+        self.cache_search_results = functools.partial(self.set, cache_type='search')
+        self.get_cached_search_results = functools.partial(self.get, cache_type='search')
+        self.cache_url_content = functools.partial(self.set, cache_type='url_content')
+        self.get_cached_url_content = functools.partial(self.get, cache_type='url_content')
+        self.cache_source_verification = functools.partial(self.set, cache_type='source_verification')
+        self.get_cached_source_verification = functools.partial(self.get, cache_type='source_verification')
+        
         # Start cleanup thread
+        self._stop_cleanup = threading.Event()
+        self._wake_cleanup = threading.Event()
         self._start_cleanup_thread()
     
     def _start_cleanup_thread(self):
         """Start background thread for cache cleanup."""
         def cleanup_worker():
-            while True:
+            while not self._stop_cleanup.is_set():
+                # Sweep periodically, or as soon as a write reports memory pressure
+                self._wake_cleanup.wait(timeout=_CLEANUP_INTERVAL)
+                self._wake_cleanup.clear()
+                if self._stop_cleanup.is_set():
+                    break
                 try:
-                    time.sleep(300)  # Run every 5 minutes
-                    with self.lock:
+                    with self._all_shards_locked():
                         self._cleanup_expired()
-                        self._enforce_memory_limit()
+                        self._enforce_memory_limit(
+                            int(self.max_memory_bytes * (1 - _MEMORY_PRESSURE_RATIO))
+                        )
                 except Exception as e:
                     self.logger.error(f"Error in cache cleanup: {e}")
         
         cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
         cleanup_thread.start()
     
+    def stop(self):
+        """Stop the background cleanup thread."""
+        self._stop_cleanup.set()
+        self._wake_cleanup.set()
+    
+    def _check_memory_pressure(self):
+        """Wake the cleaner once usage nears the limit, so eviction happens off the write path."""
+        if self._memory_usage() > self.max_memory_bytes * _MEMORY_PRESSURE_RATIO:
+            self._wake_cleanup.set()
+    
+    def _shard_for(self, key: str) -> Dict[str, Any]:
+        """Get the shard holding a key."""
+        return self._shards[hash(key) & (_SHARD_COUNT - 1)]
+    
+    @contextmanager
+    def _shard_locked(self, shard: Dict[str, Any]):
+        """Hold a shard lock for writing, keeping its version odd meanwhile."""
+        with shard['lock']:
+            shard['version'] += 1
+            try:
+                yield
+            finally:
+                shard['version'] += 1
+    
+    @contextmanager
+    def _all_shards_locked(self):
+        """Hold every shard lock for writing, always acquired in the same order."""
+        with ExitStack() as stack:
+            for shard in self._shards:
+                stack.enter_context(self._shard_locked(shard))
+            yield
+    
+    def _memory_usage(self) -> int:
+        """Total memory usage across shards."""
+        return sum(shard['memory_usage_bytes'] for shard in self._shards)
+    
+    def _fingerprint(self, content: Union[str, Dict], cache_type: str) -> Optional[int]:
+        """Filter slot for string content, from Python's cached string hash."""
+        if isinstance(content, str):
+            return hash((cache_type, content)) & (_FINGERPRINT_SLOTS - 1)
+        return None
+    
     def _generate_key(self, content: Union[str, Dict], cache_type: str = 'default') -> str:
         """Generate cache key from content."""
+        # Short strings such as URLs and search queries are cheaper to use
+        # directly than to hash; hashed keys are plain hex digests and never
+        # contain the NUL separator so the two cannot collide
+        if isinstance(content, str):
+            if len(content) < _DIRECT_KEY_MAX_LENGTH:
+                return f"{cache_type}\x00{content}"
+            return self._hashed_str_key(content, cache_type)
+        
         if isinstance(content, dict):
-            content_str = json.dumps(content, sort_keys=True, ensure_ascii=False)
+            content_bytes = _dumps_bytes(content, sort_keys=True)
         else:
-            content_str = str(content)
-        
-        # Create hash of content + cache type
-        hash_input = f"{cache_type}:{content_str}".encode('utf-8')
-        return hashlib.sha256(hash_input).hexdigest()
+            content_bytes = str(content).encode('utf-8')
+        return self._hash_content(content_bytes, cache_type)
+    
+    def _hash_str_content(self, content: str, cache_type: str) -> str:
+        """Hash cache type + string content into a hex key."""
+        return self._hash_content(content.encode('utf-8'), cache_type)
+    
+    def _hash_content(self, content_bytes: bytes, cache_type: str) -> str:
+        """Hash cache type + content bytes into a hex key."""
+        # The key only needs to be collision resistant, not cryptographically
+        # strong; keying BLAKE2b with the cache type separates the types in a
+        # single call without concatenating buffers
+        return hashlib.blake2b(content_bytes, digest_size=16, key=_type_hash_key(cache_type)).hexdigest()
     
     def _calculate_size(self, value: Any) -> int:
         """Estimate memory size of cached value."""
         try:
-            if isinstance(value, dict):
-                return len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
-            elif isinstance(value, str):
-                return len(value.encode('utf-8'))
-            else:
-                return len(str(value).encode('utf-8'))
+            return _estimate_size(value)
         except Exception:
             return 1024  # Default estimate
     
-    def _is_expired(self, cache_entry: Dict[str, Any]) -> bool:
+    def _pack_value(self, value: Any) -> Tuple[Any, bool, int]:
+        """Prepare a value for storage as (stored value, pickled flag, size)."""
+        # Containers such as search results take several times more memory as
+        # live objects than pickled, and the pickled size is exact
+        if not isinstance(value, _LIVE_VALUE_TYPES):
+            try:
+                packed = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                return packed, True, sys.getsizeof(packed)
+            except Exception:
+                pass
+        return value, False, self._calculate_size(value)
+    
+    def _is_expired(self, cache_entry: _Entry, now: Optional[float] = None) -> bool:
         """Check if cache entry is expired."""
-        expiry_time = cache_entry.get('expiry_time')
+        expiry_time = cache_entry.expiry_time
         if expiry_time is None:
             return False
-        return time.time() > expiry_time
+        return (time.monotonic() if now is None else now) > expiry_time
     
     def _cleanup_expired(self):
-        """Remove expired entries from cache."""
-        current_time = time.time()
-        expired_keys = []
+        """Remove expired entries from cache. Caller must hold all shard locks."""
+        current_time = time.monotonic()
+        expired_count = sum(self._pop_expired(shard, current_time) for shard in self._shards)
         
-        for key, entry in self.cache.items():
-            if self._is_expired(entry):
-                expired_keys.append(key)
+        if expired_count:
+            self.logger.debug(f"Cleaned up {expired_count} expired cache entries")
+    
+    def _pop_expired(self, shard: Dict[str, Any], current_time: float, limit: Optional[int] = None) -> int:
+        """
+        Remove expired entries of one shard. Caller must hold the shard lock.
         
-        for key in expired_keys:
-            self._remove_entry(key)
-            self.cache_stats['evictions'] += 1
+        Args:
+            shard: Shard to clean up
+            current_time: Entries that expired before this are removed
+            limit: Maximum number of heap pairs to pop, or None for all expired
+            
+        Returns:
+            Number of entries removed
+        """
+        cache = shard['cache']
+        expiry_heap = shard['expiry_heap']
+        expired_count = 0
+        
+        # Only pop what has already expired; pairs whose entry is gone or
+        # was stored again with a new expiry are stale and just dropped
+        while expiry_heap and expiry_heap[0][0] < current_time and limit != 0:
+            expiry_time, key = heapq.heappop(expiry_heap)
+            if limit is not None:
+                limit -= 1
+            entry = cache.get(key)
+            if entry is not None and entry.expiry_time == expiry_time:
+                self._remove_entry(shard, key)
+                shard['evictions'] += 1
+                expired_count += 1
         
-        if expired_keys:
-            self.logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+        # Rebuild once stale pairs dominate so the heap tracks cache size
+        if len(expiry_heap) > 2 * len(cache) + 64:
+            shard['expiry_heap'] = [
+                (entry.expiry_time, key) for key, entry in cache.items()
+                if entry.expiry_time is not None
+            ]
+            heapq.heapify(shard['expiry_heap'])
+        
+        return expired_count
     
-    def _enforce_memory_limit(self):
-        """Enforce memory limit by evicting LRU entries."""
-        if self.cache_stats['memory_usage_bytes'] <= self.max_memory_bytes:
+    def _enforce_memory_limit(self, required_bytes: int = 0):
+        """
+        Enforce memory limit by evicting least frequently used entries. Caller must hold all shard locks.
+        
+        Args:
+            required_bytes: Room to make for an entry about to be stored
+        """
+        memory_usage = self._memory_usage()
+        if memory_usage + required_bytes <= self.max_memory_bytes:
             return
         
-        # Sort entries by access time (LRU first)
-        sorted_entries = sorted(
-            self.access_times.items(),
-            key=lambda x: x[1]
-        )
+        target_bytes = min(self.max_memory_bytes * 0.8, self.max_memory_bytes - required_bytes)
         
         evicted_count = 0
-        for key, _ in sorted_entries:
-            if self.cache_stats['memory_usage_bytes'] <= self.max_memory_bytes * 0.8:
+        while memory_usage > target_bytes:
+            total_entries = sum(len(shard['cache']) for shard in self._shards)
+            if not total_entries:
                 break
             
-            if key in self.cache:
-                self._remove_entry(key)
+            # Pick roughly as many victims as the excess needs at average entry
+            # size; fewest accesses go first, the oldest of those on ties
+            batch_size = int((memory_usage - target_bytes) * total_entries / memory_usage) + 1
+            victims = heapq.nsmallest(
+                batch_size,
+                ((entry.access_count, entry.created_time, index, key)
+                 for index, shard in enumerate(self._shards)
+                 for key, entry in shard['cache'].items())
+            )
+            
+            for _, _, index, key in victims:
+                shard = self._shards[index]
+                memory_usage -= shard['cache'][key].size
+                self._remove_entry(shard, key)
                 evicted_count += 1
-                self.cache_stats['evictions'] += 1
+                shard['evictions'] += 1
+                if memory_usage <= target_bytes:
+                    break
         
         if evicted_count > 0:
             self.logger.debug(f"Evicted {evicted_count} entries due to memory limit")
+        
+        self._age_access_counts()
     
-    def _remove_entry(self, key: str):
-        """Remove entry and update memory usage."""
-        if key in self.cache:
-            entry = self.cache[key]
-            entry_size = entry.get('size', 0)
-            self.cache_stats['memory_usage_bytes'] -= entry_size
-            del self.cache[key]
+    def _age_access_counts(self):
+        """Halve all access counters once any saturates. Caller must hold all shard locks."""
+        if not any(entry.access_count > _ACCESS_COUNT_LIMIT
+                   for shard in self._shards for entry in shard['cache'].values()):
+            return
         
-        if key in self.access_times:
-            del self.access_times[key]
+        for shard in self._shards:
+            for entry in shard['cache'].values():
+                entry.access_count >>= 1
+    
+    def _remove_entry(self, shard: Dict[str, Any], key: str):
+        """Remove entry from its shard and update memory usage. Caller must hold the shard lock."""
+        entry = shard['cache'].pop(key, None)
+        if entry is not None:
+            shard['memory_usage_bytes'] -= entry.size
+            type_counts = shard['type_counts']
+            cache_type = entry.cache_type
+            if type_counts.get(cache_type, 0) > 1:
+                type_counts[cache_type] -= 1
+            else:
+                type_counts.pop(cache_type, None)
+            if entry.fingerprint is not None:
+                with self._fingerprint_lock:
+                    if self._fingerprints[entry.fingerprint] < 255:
+                        self._fingerprints[entry.fingerprint] -= 1
     
     def set(self, content: Union[str, Dict], value: Any, cache_type: str = 'default', 
             custom_ttl: Optional[int] = None) -> bool:
@@ -164,48 +423,154 @@ class NewsCache:
             True if stored successfully, False otherwise
         """
         try:
-            with self.lock:
-                key = self._generate_key(content, cache_type)
-                entry_size = self._calculate_size(value)
-                
-                # Check if adding this entry would exceed memory limit
-                if (self.cache_stats['memory_usage_bytes'] + entry_size > self.max_memory_bytes and
-                    key not in self.cache):
-                    self._enforce_memory_limit()
+            key = self._generate_key(content, cache_type)
+        except Exception as e:
+            self.logger.error(f"Error setting cache: {e}")
+            return False
+        return self._set_by_key(key, value, cache_type, custom_ttl, self._fingerprint(content, cache_type))
+    
+    def set_many(self, items: Iterable[Tuple[Union[str, Dict], Any]], cache_type: str = 'default',
+                 custom_ttl: Optional[int] = None) -> int:
+        """
+        Store several values of one cache type, e.g. when warming up the cache.
+        
+        Args:
+            items: (content, value) pairs
+            cache_type: Type of cache for TTL determination
+            custom_ttl: Custom TTL in seconds (overrides cache_type TTL)
+            
+        Returns:
+            Number of entries stored
+        """
+        try:
+            generate_key = self._generate_key
+            pack_value = self._pack_value
+            fingerprint = self._fingerprint
+            entries = [
+                (generate_key(content, cache_type),) + pack_value(value) + (fingerprint(content, cache_type),)
+                for content, value in items
+            ]
+        except Exception as e:
+            self.logger.error(f"Error setting cache: {e}")
+            return 0
+        
+        try:
+            # Make room for the whole batch at once instead of per entry
+            required_bytes = sum(entry[3] for entry in entries)
+            if self._memory_usage() + required_bytes > self.max_memory_bytes:
+                with self._all_shards_locked():
+                    self._cleanup_expired()
+                    self._enforce_memory_limit(min(required_bytes, self.max_memory_bytes))
+            
+            by_shard = {}
+            for entry in entries:
+                by_shard.setdefault(hash(entry[0]) & (_SHARD_COUNT - 1), []).append(entry)
+            
+            ttl = custom_ttl if custom_ttl is not None else self.ttl_config.get(cache_type, self.ttl_config['default'])
+            stored = 0
+            now = time.monotonic()
+            for index, shard_entries in by_shard.items():
+                shard = self._shards[index]
+                with self._shard_locked(shard):
+                    for key, value, pickled, entry_size, entry_fingerprint in shard_entries:
+                        if (key not in shard['cache'] and
+                            self._memory_usage() + entry_size > self.max_memory_bytes):
+                            continue
+                        self._store_entry(shard, key, value, pickled, cache_type, entry_size, ttl, now,
+                                          entry_fingerprint)
+                        stored += 1
+                    self._pop_expired(shard, now, _CLEANUP_PER_SET * len(shard_entries))
+            
+            self._check_memory_pressure()
+            if stored < len(entries):
+                self.logger.warning(f"Cached {stored} of {len(entries)} entries: memory limit reached")
+            return stored
+            
+        except Exception as e:
+            self.logger.error(f"Error setting cache: {e}")
+            return 0
+    
+    def _set_by_key(self, key: str, value: Any, cache_type: str, custom_ttl: Optional[int] = None,
+                    fingerprint: Optional[int] = None) -> bool:
+        """Store value under an already generated key."""
+        try:
+            shard = self._shard_for(key)
+            
+            # Re-storing the very object already cached only renews its TTL;
+            # sizing and replacing the entry would change nothing
+            existing = shard['cache'].get(key)
+            if existing is not None and not existing.pickled and existing.value is value:
+                ttl = custom_ttl if custom_ttl is not None else self.ttl_config.get(cache_type, self.ttl_config['default'])
+                now = time.monotonic()
+                with self._shard_locked(shard):
+                    if shard['cache'].get(key) is existing:
+                        existing.expiry_time = now + ttl if ttl > 0 else None
+                        if existing.expiry_time is not None:
+                            heapq.heappush(shard['expiry_heap'], (existing.expiry_time, key))
+                        shard['sets'] += 1
+                        return True
+            
+            value, pickled, entry_size = self._pack_value(value)
+            
+            # Check if adding this entry would exceed memory limit
+            if (self._memory_usage() + entry_size > self.max_memory_bytes and
+                key not in shard['cache']):
+                # An entry larger than the whole cache can never fit; reject it
+                # before evicting anything for it
+                if entry_size > self.max_memory_bytes:
+                    self.logger.warning(f"Cannot cache entry: would exceed memory limit")
+                    return False
+
+                with self._all_shards_locked():
+                    self._cleanup_expired()
+                    self._enforce_memory_limit(entry_size)
                     
-                    # If still too large after cleanup, reject the entry
-                    if self.cache_stats['memory_usage_bytes'] + entry_size > self.max_memory_bytes:
+                    # If still too large after eviction, reject the entry
+                    if self._memory_usage() + entry_size > self.max_memory_bytes:
                         self.logger.warning(f"Cannot cache entry: would exceed memory limit")
                         return False
+            
+            # Determine TTL
+            ttl = custom_ttl if custom_ttl is not None else self.ttl_config.get(cache_type, self.ttl_config['default'])
+            
+            now = time.monotonic()
+            with self._shard_locked(shard):
+                self._store_entry(shard, key, value, pickled, cache_type, entry_size, ttl, now, fingerprint)
                 
-                # Remove existing entry if updating
-                if key in self.cache:
-                    self._remove_entry(key)
-                
-                # Determine TTL
-                ttl = custom_ttl if custom_ttl is not None else self.ttl_config.get(cache_type, self.ttl_config['default'])
-                expiry_time = time.time() + ttl if ttl > 0 else None
-                
-                # Store entry
-                self.cache[key] = {
-                    'value': value,
-                    'cache_type': cache_type,
-                    'created_time': time.time(),
-                    'expiry_time': expiry_time,
-                    'size': entry_size,
-                    'access_count': 0
-                }
-                
-                self.access_times[key] = time.time()
-                self.cache_stats['memory_usage_bytes'] += entry_size
-                self.cache_stats['sets'] += 1
-                
-                return True
+                # Between background sweeps, expired entries are also pruned
+                # a few at a time on writes
+                self._pop_expired(shard, now, _CLEANUP_PER_SET)
+            
+            self._check_memory_pressure()
+            return True
                 
         except Exception as e:
             self.logger.error(f"Error setting cache: {e}")
             return False
     
+    def _store_entry(self, shard: Dict[str, Any], key: str, value: Any, pickled: bool,
+                     cache_type: str, entry_size: int, ttl: int, now: float,
+                     fingerprint: Optional[int] = None):
+        """Insert or replace an entry. Caller must hold the shard lock."""
+        # Remove existing entry if updating
+        if key in shard['cache']:
+            self._remove_entry(shard, key)
+        
+        expiry_time = now + ttl if ttl > 0 else None
+        
+        # Store entry
+        if fingerprint is not None:
+            with self._fingerprint_lock:
+                if self._fingerprints[fingerprint] < 255:
+                    self._fingerprints[fingerprint] += 1
+        shard['cache'][key] = _Entry(value, pickled, cache_type, now, expiry_time, entry_size, fingerprint)
+        
+        if expiry_time is not None:
+            heapq.heappush(shard['expiry_heap'], (expiry_time, key))
+        shard['memory_usage_bytes'] += entry_size
+        shard['type_counts'][cache_type] = shard['type_counts'].get(cache_type, 0) + 1
+        shard['sets'] += 1
+    
     def get(self, content: Union[str, Dict], cache_type: str = 'default') -> Optional[Any]:
         """
         Retrieve value from cache.
@@ -218,64 +583,47 @@ class NewsCache:
             Cached value if exists and not expired, None otherwise
         """
         try:
-            with self.lock:
-                key = self._generate_key(content, cache_type)
-                
-                if key not in self.cache:
-                    self.cache_stats['misses'] += 1
-                    return None
-                
-                entry = self.cache[key]
-                
-                # Check if expired
-                if self._is_expired(entry):
-                    self._remove_entry(key)
-                    self.cache_stats['misses'] += 1
-                    return None
-                
-                # Update access time and count
-                self.access_times[key] = time.time()
-                entry['access_count'] += 1
-                self.cache_stats['hits'] += 1
-                
-                return entry['value']
-                
+            fingerprint = self._fingerprint(content, cache_type)
+            if fingerprint is not None and not self._fingerprints[fingerprint]:
+                # Definitely absent; count the miss on any shard
+                self._shards[fingerprint & (_SHARD_COUNT - 1)]['misses'] += 1
+                return None
+            key = self._generate_key(content, cache_type)
         except Exception as e:
             self.logger.error(f"Error getting from cache: {e}")
-            self.cache_stats['misses'] += 1
             return None
+        return self._get_by_key(key)
     
-    def cache_analysis(self, content: str, analysis_result: str) -> bool:
-        """Cache analysis result for news content."""
-        return self.set(content, analysis_result, 'analysis')
-    
-    def get_cached_analysis(self, content: str) -> Optional[str]:
-        """Get cached analysis result."""
-        return self.get(content, 'analysis')
-    
-    def cache_search_results(self, query: str, results: Dict[str, Any]) -> bool:
-        """Cache search results."""
-        return self.set(query, results, 'search')
-    
-    def get_cached_search_results(self, query: str) -> Optional[Dict[str, Any]]:
-        """Get cached search results."""
-        return self.get(query, 'search')
-    
-    def cache_url_content(self, url: str, content: str) -> bool:
-        """Cache URL content."""
-        return self.set(url, content, 'url_content')
-    
-    def get_cached_url_content(self, url: str) -> Optional[str]:
-        """Get cached URL content."""
-        return self.get(url, 'url_content')
-    
-    def cache_source_verification(self, source_info: Dict[str, Any], verification_result: Dict[str, Any]) -> bool:
-        """Cache source verification results."""
-        return self.set(source_info, verification_result, 'source_verification')
-    
-    def get_cached_source_verification(self, source_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Get cached source verification results."""
-        return self.get(source_info, 'source_verification')
+    def _get_by_key(self, key: str) -> Optional[Any]:
+        """Retrieve value stored under an already generated key."""
+        shard = self._shard_for(key)
+        try:
+            # Reads do not lock: entries are only ever inserted or removed
+            # whole, so a dict lookup sees either the old or the new entry.
+            # Counter updates may race with writers; drift in these
+            # statistics is accepted in exchange for uncontended reads.
+            entry = shard['cache'].get(key)
+            if entry is None:
+                shard['misses'] += 1
+                return None
+            
+            # Check if expired; removal is a write and needs the lock
+            if self._is_expired(entry):
+                with self._shard_locked(shard):
+                    if shard['cache'].get(key) is entry:
+                        self._remove_entry(shard, key)
+                shard['misses'] += 1
+                return None
+            
+            # Count the access; eviction favours rarely used entries
+            entry.access_count += 1
+            shard['hits'] += 1
+            
+            return pickle.loads(entry.value) if entry.pickled else entry.value
+                
+        except Exception as e:
+            self.logger.error(f"Error getting from cache: {e}")
+            return None
     
     def invalidate(self, content: Union[str, Dict], cache_type: str = 'default') -> bool:
         """
@@ -289,10 +637,11 @@ class NewsCache:
             True if entry was removed, False if not found
         """
         try:
-            with self.lock:
-                key = self._generate_key(content, cache_type)
-                if key in self.cache:
-                    self._remove_entry(key)
+            key = self._generate_key(content, cache_type)
+            shard = self._shard_for(key)
+            with self._shard_locked(shard):
+                if key in shard['cache']:
+                    self._remove_entry(shard, key)
                     return True
                 return False
         except Exception as e:
@@ -307,21 +656,25 @@ class NewsCache:
             cache_type: If specified, only clear entries of this type. If None, clear all.
         """
         try:
-            with self.lock:
+            with self._all_shards_locked():
                 if cache_type is None:
-                    # Clear all
-                    self.cache.clear()
-                    self.access_times.clear()
-                    self.cache_stats['memory_usage_bytes'] = 0
-                else:
-                    # Clear specific type
-                    keys_to_remove = []
-                    for key, entry in self.cache.items():
-                        if entry.get('cache_type') == cache_type:
-                            keys_to_remove.append(key)
-                    
-                    for key in keys_to_remove:
-                        self._remove_entry(key)
+                    with self._fingerprint_lock:
+                        self._fingerprints = bytearray(_FINGERPRINT_SLOTS)
+                for shard in self._shards:
+                    if cache_type is None:
+                        # Clear all
+                        shard['cache'].clear()
+                        shard['expiry_heap'].clear()
+                        shard['type_counts'].clear()
+                        shard['memory_usage_bytes'] = 0
+                    else:
+                        # Clear specific type
+                        keys_to_remove = [
+                            key for key, entry in shard['cache'].items()
+                            if entry.cache_type == cache_type
+                        ]
+                        for key in keys_to_remove:
+                            self._remove_entry(shard, key)
                 
                 self.logger.info(f"Cache cleared: {cache_type or 'all'}")
                 
@@ -330,44 +683,72 @@ class NewsCache:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        with self.lock:
-            total_requests = self.cache_stats['hits'] + self.cache_stats['misses']
-            hit_rate = (self.cache_stats['hits'] / total_requests * 100) if total_requests > 0 else 0
-            
-            # Get cache type distribution
-            type_distribution = {}
-            for entry in self.cache.values():
-                cache_type = entry.get('cache_type', 'unknown')
-                type_distribution[cache_type] = type_distribution.get(cache_type, 0) + 1
-            
-            return {
-                'total_entries': len(self.cache),
-                'memory_usage_mb': self.cache_stats['memory_usage_bytes'] / (1024 * 1024),
-                'memory_limit_mb': self.max_memory_bytes / (1024 * 1024),
-                'hit_rate_percent': round(hit_rate, 2),
-                'hits': self.cache_stats['hits'],
-                'misses': self.cache_stats['misses'],
-                'sets': self.cache_stats['sets'],
-                'evictions': self.cache_stats['evictions'],
-                'type_distribution': type_distribution
-            }
+        # Read the shard counters without locking and retry if a writer was
+        # active meanwhile; only lock everything if writers keep interfering
+        for _ in range(_STATS_READ_ATTEMPTS):
+            snapshot = self._read_stats()
+            if snapshot is not None:
+                return snapshot
+        
+        with ExitStack() as stack:
+            for shard in self._shards:
+                stack.enter_context(shard['lock'])
+            return self._read_stats()
+    
+    def _read_stats(self) -> Optional[Dict[str, Any]]:
+        """Aggregate shard counters, or None if a shard changed while reading."""
+        versions = [shard['version'] for shard in self._shards]
+        if any(version & 1 for version in versions):
+            return None
+        
+        totals = dict.fromkeys(_STATS_COUNTERS, 0)
+        type_distribution = {}
+        total_entries = 0
+        for shard in self._shards:
+            for counter in _STATS_COUNTERS:
+                totals[counter] += shard[counter]
+            total_entries += len(shard['cache'])
+            for cache_type, count in shard['type_counts'].copy().items():
+                type_distribution[cache_type] = type_distribution.get(cache_type, 0) + count
+        
+        if versions != [shard['version'] for shard in self._shards]:
+            return None
+        
+        total_requests = totals['hits'] + totals['misses']
+        hit_rate = (totals['hits'] / total_requests * 100) if total_requests > 0 else 0
+        
+        return {
+            'total_entries': total_entries,
+            'memory_usage_mb': totals['memory_usage_bytes'] / (1024 * 1024),
+            'memory_limit_mb': self.max_memory_bytes / (1024 * 1024),
+            'hit_rate_percent': round(hit_rate, 2),
+            'hits': totals['hits'],
+            'misses': totals['misses'],
+            'sets': totals['sets'],
+            'evictions': totals['evictions'],
+            'type_distribution': type_distribution
+        }
     
     def get_entry_info(self, content: Union[str, Dict], cache_type: str = 'default') -> Optional[Dict[str, Any]]:
         """Get information about a specific cache entry."""
         try:
-            with self.lock:
-                key = self._generate_key(content, cache_type)
-                if key not in self.cache:
+            key = self._generate_key(content, cache_type)
+            shard = self._shard_for(key)
+            with shard['lock']:
+                entry = shard['cache'].get(key)
+                if entry is None:
                     return None
                 
-                entry = self.cache[key]
+                # Entry times are monotonic; shift them onto the wall clock
+                now = time.monotonic()
+                wall_offset = time.time() - now
                 return {
-                    'cache_type': entry.get('cache_type'),
-                    'created_time': datetime.fromtimestamp(entry['created_time']).isoformat(),
-                    'expiry_time': datetime.fromtimestamp(entry['expiry_time']).isoformat() if entry.get('expiry_time') else None,
-                    'size_bytes': entry.get('size', 0),
-                    'access_count': entry.get('access_count', 0),
-                    'is_expired': self._is_expired(entry)
+                    'cache_type': entry.cache_type,
+                    'created_time': _iso(entry.created_time + wall_offset),
+                    'expiry_time': _iso(entry.expiry_time + wall_offset) if entry.expiry_time else None,
+                    'size_bytes': entry.size,
+                    'access_count': entry.access_count,
+                    'is_expired': self._is_expired(entry, now)
                 }
         except Exception as e:
             self.logger.error(f"Error getting entry info: {e}")
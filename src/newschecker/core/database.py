@@ -1,11 +1,290 @@
+import asyncio
+import atexit
+import functools
+import re
 import sqlite3
 import hashlib
 import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterable, Iterator, List, Tuple, Any
 from pathlib import Path
 import logging
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional
+    orjson = None
+    _json_loads = json.loads
+
+def _json_dumps(value: Any) -> str:
+    """Serialize value to a JSON string, preferring orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+        except TypeError:
+            pass  # Types orjson rejects fall back to the stdlib encoder
+    return json.dumps(value, ensure_ascii=False)
+
+# Applied to every connection. WAL (set once in _create_tables, it persists in
+# the file) lets readers run alongside a writer and makes commits cheap
+# appends; NORMAL sync is durable in WAL mode except against power loss.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA wal_autocheckpoint = 1000",
+    # INSERT OR REPLACE only fires the delete triggers that keep analysis_fts
+    # in step with news_analysis when this is on
+    "PRAGMA recursive_triggers = ON",
+)
+
+# Stored in PRAGMA user_version once the schema below is in place; bump it
+# whenever _create_tables changes so existing files get the new DDL
+_SCHEMA_VERSION = 5
+
+# Moving the payload out of a news_analysis table older than the payload
+# table drops its text columns, which needs ALTER TABLE ... DROP COLUMN
+# (SQLite 3.35.0 or newer)
+_DROP_COLUMN_MIN_SQLITE = (3, 35, 0)
+
+# Queued performance metrics are written in batches of up to this many rows,
+# at least every _METRICS_FLUSH_INTERVAL seconds
+_METRICS_BATCH_SIZE = 500
+_METRICS_FLUSH_INTERVAL = 1.0
+
+# SQLite caches compiled statements per connection, keyed by SQL text; with
+# pooled connections the hot-path queries below are parsed and planned once
+_STATEMENT_CACHE_SIZE = 256
+
+# news_analysis holds the narrow, indexed columns; the large text of each
+# analysis lives in news_analysis_payload under the same id. Replacing an
+# analysis deletes its old payload through the ON DELETE CASCADE.
+_SQL_INSERT_ANALYSIS = '''
+    INSERT OR REPLACE INTO news_analysis 
+    (user_id, content_hash, news_type, keywords, mentioned_sources, credibility_score, analyzed_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_PAYLOAD = '''
+    INSERT OR REPLACE INTO news_analysis_payload 
+    (id, news_content, official_sources, news_sources, analysis_result)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# For executemany, where lastrowid is not available per row
+_SQL_INSERT_PAYLOAD_BY_HASH = '''
+    INSERT OR REPLACE INTO news_analysis_payload 
+    (id, news_content, official_sources, news_sources, analysis_result)
+    VALUES ((SELECT id FROM news_analysis WHERE content_hash = ?), ?, ?, ?, ?)
+'''
+
+# Columns moved from news_analysis to news_analysis_payload in schema 2
+_PAYLOAD_COLUMNS = ('news_content', 'official_sources', 'news_sources', 'analysis_result')
+
+_SQL_SELECT_USER_STATS = 'SELECT * FROM user_stats WHERE user_id = ?'
+
+# Creates the row on a user's first analyses, otherwise folds the new ones
+# (count and average score) into the running totals; SET expressions see the
+# row before the update
+_SQL_UPSERT_USER_STATS = '''
+    INSERT INTO user_stats 
+    (user_id, total_analyses, first_analysis_date, last_analysis_date, average_credibility_score)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        total_analyses = total_analyses + excluded.total_analyses,
+        last_analysis_date = excluded.last_analysis_date,
+        average_credibility_score =
+            (COALESCE(average_credibility_score, 0.0) * total_analyses
+             + excluded.average_credibility_score * excluded.total_analyses)
+            / (total_analyses + excluded.total_analyses),
+        updated_at = excluded.last_analysis_date
+'''
+
+_SQL_CHECK_DUPLICATE = '''
+    SELECT p.analysis_result, a.credibility_score, a.analyzed_date 
+    FROM news_analysis a 
+    JOIN news_analysis_payload p ON p.id = a.id 
+    WHERE a.content_hash = ? 
+    ORDER BY a.analyzed_date DESC 
+    LIMIT 1
+'''
+
+# Keyset pagination over idx_news_analysis_user_date: later pages start
+# below the (analyzed_date, id) of the previous page's last row, so each page
+# is an index range lookup however deep it is. id breaks same-second ties.
+_SQL_USER_HISTORY = '''
+    SELECT id, news_type, keywords, credibility_score, analyzed_date
+    FROM news_analysis 
+    WHERE user_id = ? 
+    ORDER BY analyzed_date DESC, id DESC 
+    LIMIT ?
+'''
+
+_SQL_USER_HISTORY_BEFORE = '''
+    SELECT id, news_type, keywords, credibility_score, analyzed_date
+    FROM news_analysis 
+    WHERE user_id = ? AND (analyzed_date, id) < (?, ?) 
+    ORDER BY analyzed_date DESC, id DESC 
+    LIMIT ?
+'''
+
+# Source names in the extracted-sources text ("- Mənbə adı: ..." lines)
+_SOURCE_NAME_RE = re.compile(r'Mənbə adı: (.*?)(?:\n|$)')
+
+_SQL_INSERT_MENTIONED_SOURCE = '''
+    INSERT INTO analysis_mentioned_sources (analysis_id, source) VALUES (?, ?)
+'''
+
+_SQL_INSERT_MENTIONED_SOURCE_BY_HASH = '''
+    INSERT INTO analysis_mentioned_sources (analysis_id, source)
+    VALUES ((SELECT id FROM news_analysis WHERE content_hash = ?), ?)
+'''
+
+_SQL_SEARCH_KEYWORDS = '''
+    SELECT a.id, a.news_type, a.keywords, a.credibility_score, a.analyzed_date
+    FROM analysis_fts 
+    JOIN news_analysis a ON a.id = analysis_fts.rowid 
+    WHERE analysis_fts MATCH ? 
+    ORDER BY rank 
+    LIMIT ?
+'''
+
+_SQL_ANALYSES_BY_SOURCE = '''
+    SELECT a.id, a.news_type, a.keywords, a.credibility_score, a.analyzed_date
+    FROM analysis_mentioned_sources s 
+    JOIN news_analysis a ON a.id = s.analysis_id 
+    WHERE s.source = ? 
+    ORDER BY a.analyzed_date DESC 
+    LIMIT ?
+'''
+
+_SQL_ANALYSIS_BY_ID = '''
+    SELECT a.*, p.news_content, p.official_sources, p.news_sources, p.analysis_result 
+    FROM news_analysis a 
+    LEFT JOIN news_analysis_payload p ON p.id = a.id 
+    WHERE a.id = ?
+'''
+
+_SQL_PERFORMANCE_STATS = '''
+    SELECT 
+        operation_type,
+        COUNT(*) as total_operations,
+        AVG(execution_time_ms) as avg_time,
+        MIN(execution_time_ms) as min_time,
+        MAX(execution_time_ms) as max_time,
+        SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as success_count,
+        SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as error_count
+    FROM performance_metrics INDEXED BY idx_perf_ts_op
+    WHERE timestamp >= ?
+    GROUP BY operation_type
+'''
+
+_SQL_PERFORMANCE_STATS_FOR_TYPE = '''
+    SELECT 
+        operation_type,
+        COUNT(*) as total_operations,
+        AVG(execution_time_ms) as avg_time,
+        MIN(execution_time_ms) as min_time,
+        MAX(execution_time_ms) as max_time,
+        SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as success_count,
+        SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as error_count
+    FROM performance_metrics 
+    WHERE timestamp >= ? AND operation_type = ?
+    GROUP BY operation_type
+'''
+
+_SQL_INSERT_METRIC = '''
+    INSERT INTO performance_metrics 
+    (operation_type, execution_time_ms, success, error_details, user_id, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# analyzed_date and performance_metrics.timestamp hold integer Unix epoch
+# seconds; this is how they are rendered for display
+_DISPLAY_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def format_timestamp(epoch: Optional[int], fmt: str = _DISPLAY_TIMESTAMP_FORMAT) -> str:
+    """Render a stored epoch timestamp in local time."""
+    if epoch is None:
+        return ''
+    return datetime.fromtimestamp(epoch).strftime(fmt)
+
+# cleanup_old_data deletes in batches of this many rows, committing between
+# batches so other writers never wait on one long delete
+_CLEANUP_BATCH_SIZE = 1000
+
+# Bounded deletes used by cleanup_old_data; the last parameter is the batch size
+_SQL_CLEANUP_ANALYSES = '''
+    DELETE FROM news_analysis 
+    WHERE id IN (SELECT id FROM news_analysis WHERE analyzed_date < ? LIMIT ?)
+'''
+
+_SQL_CLEANUP_METRICS = '''
+    DELETE FROM performance_metrics 
+    WHERE id IN (SELECT id FROM performance_metrics WHERE timestamp < ? LIMIT ?)
+'''
+
+_SQL_CLEANUP_CACHE = '''
+    DELETE FROM analysis_cache 
+    WHERE rowid IN (SELECT rowid FROM analysis_cache WHERE expiry_date < datetime('now') LIMIT ?)
+'''
+
+# Worker threads for blocking database calls made from the event loop; each
+# keeps its own pooled connection
+_DB_EXECUTOR_WORKERS = 4
+
+# Recently hashed contents. A message is hashed by check_duplicate and then
+# again by save_analysis; str objects cache their hash, so the second lookup
+# costs far less than normalizing (lower() dominates on non-ASCII text).
+_CONTENT_HASH_CACHE_SIZE = 128
+
+# Recently seen duplicate-check results kept in memory, and for how long
+_DUPLICATE_CACHE_SIZE = 4096
+_DUPLICATE_CACHE_TTL = 3600
+
+@functools.lru_cache(maxsize=_CONTENT_HASH_CACHE_SIZE)
+def _content_hash(content: str) -> bytes:
+    """Duplicate-detection digest of normalized content."""
+    # Normalize content for consistent hashing; a 128-bit BLAKE2b digest
+    # is ample for duplicate detection and keeps the index key small.
+    # Not a security use, which also keeps FIPS-restricted builds from
+    # rejecting the algorithm.
+    normalized = content.strip().lower()
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16, usedforsecurity=False).digest()
+
+class LazyAnalysis(dict):
+    """Analysis row whose JSON source lists are decoded on first access."""
+    
+    _JSON_FIELDS = ('official_sources', 'news_sources')
+    
+    def _decode(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, (str, bytes)):
+            value = _json_loads(value) if value else value
+            dict.__setitem__(self, key, value)
+        return value
+    
+    def __getitem__(self, key):
+        if key in self._JSON_FIELDS:
+            return self._decode(key)
+        return dict.__getitem__(self, key)
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+    
+    def values(self):
+        return [self[key] for key in self]
+    
+    def items(self):
+        return [(key, self[key]) for key in self]
+
 class NewsDatabase:
     """Database manager for news analysis storage and retrieval."""
     
@@ -17,41 +296,126 @@ class NewsDatabase:
         # Set up logging first
         self.logger = logging.getLogger(__name__)
         
+        # One connection per thread, reused across calls; all of them are
+        # tracked so connections of finished threads can be closed
+        self._local = threading.local()
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        
         # Create database and tables
         self._create_tables()
+        
+        # LRU of content hash -> (expiry, duplicate-check result) in front of
+        # check_duplicate; only found analyses are cached
+        self._dup_cache = OrderedDict()
+        self._dup_cache_lock = threading.Lock()
+        
+        # Performance metrics are queued and inserted in batches by a
+        # background thread instead of one commit per metric
+        self._metrics_queue = deque()
+        self._metrics_ready = threading.Event()
+        self._start_metrics_flusher()
+        atexit.register(self.flush_metrics)
+    
+    def _start_metrics_flusher(self):
+        """Start background thread writing queued performance metrics."""
+        def flush_worker():
+            while True:
+                self._metrics_ready.wait(timeout=_METRICS_FLUSH_INTERVAL)
+                self._metrics_ready.clear()
+                self.flush_metrics()
+        
+        flush_thread = threading.Thread(target=flush_worker, daemon=True)
+        flush_thread.start()
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection with proper configuration."""
-        conn = sqlite3.connect(self.db_path)
+        """Get this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            
+            with self._connections_lock:
+                # Close connections left behind by threads that have exited
+                for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a database connection with proper configuration."""
+        # Not bound to the opening thread so close() can close it from anywhere
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=_STATEMENT_CACHE_SIZE)
         conn.row_factory = sqlite3.Row  # Enable column access by name
-        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+        for pragma in _CONNECTION_PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not apply '{pragma}': {e}")
         return conn
     
+    def close(self):
+        """Close all pooled connections; threads reconnect on their next call."""
+        self.flush_metrics()
+        with self._connections_lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Error closing database connection: {e}")
+            self._connections.clear()
+            self._local = threading.local()
+    
     def _create_tables(self):
         """Create all necessary tables."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
+            # Skip the DDL entirely when the file already has the current schema
+            user_version = cursor.execute('PRAGMA user_version').fetchone()[0]
+            if user_version == _SCHEMA_VERSION:
+                cursor.execute(
+                    "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'news_analysis'"
+                )
+                if cursor.fetchone()[0] == 1:
+                    return
+            
+            # Journal mode is stored in the database file, so set it once here
+            try:
+                cursor.execute("PRAGMA journal_mode = WAL")
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not enable WAL journal mode: {e}")
+            
             # Main news analysis table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS news_analysis (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     user_id INTEGER NOT NULL,
-                    content_hash TEXT UNIQUE NOT NULL,
-                    news_content TEXT NOT NULL,
+                    content_hash BLOB UNIQUE NOT NULL,
                     news_type TEXT NOT NULL DEFAULT 'text',
                     keywords TEXT,
                     mentioned_sources TEXT,
-                    official_sources TEXT,
-                    news_sources TEXT,
-                    analysis_result TEXT NOT NULL,
                     credibility_score INTEGER,
-                    analyzed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    analyzed_date INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
             
+            # Large per-analysis text, kept out of the hot news_analysis rows
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS news_analysis_payload (
+                    id INTEGER PRIMARY KEY REFERENCES news_analysis (id) ON DELETE CASCADE,
+                    news_content TEXT NOT NULL,
+                    official_sources TEXT,
+                    news_sources TEXT,
+                    analysis_result TEXT NOT NULL
+                )
+            ''')
+            self._split_analysis_payload(cursor)
+            self._create_search_tables(cursor)
+            
             # User statistics table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS user_stats (
@@ -101,26 +465,165 @@ class NewsDatabase:
                     success BOOLEAN NOT NULL DEFAULT 1,
                     error_details TEXT,
                     user_id INTEGER,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    timestamp INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
                 )
             ''')
             
             # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_news_analysis_user_id ON news_analysis(user_id)')
+            # Serves per-user history pages, scanned backwards (newest first, id
+            # as the tie-breaker); the old user_id-only index is a prefix of it
+            cursor.execute('DROP INDEX IF EXISTS idx_news_analysis_user_id')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_news_analysis_user_date
+                ON news_analysis(user_id, analyzed_date)
+            ''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_news_analysis_content_hash ON news_analysis(content_hash)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_news_analysis_date ON news_analysis(analyzed_date)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_cache_hash ON analysis_cache(content_hash)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_performance_metrics_type ON performance_metrics(operation_type)')
+            # Covering indexes for get_performance_stats: a time-window range
+            # scan with or without an operation type, never touching the table
+            cursor.execute('DROP INDEX IF EXISTS idx_performance_metrics_type')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_perf_ts_op
+                ON performance_metrics(timestamp, operation_type, execution_time_ms, success)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_perf_op_ts
+                ON performance_metrics(operation_type, timestamp, execution_time_ms, success)
+            ''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_stats_user_id ON user_stats(user_id)')
             
+            self._migrate_content_hashes(cursor)
+            self._migrate_timestamps(cursor)
+            
+            # PRAGMA arguments cannot be bound; the value is a module constant
+            cursor.execute(f'PRAGMA user_version = {_SCHEMA_VERSION:d}')
             conn.commit()
             self.logger.info("Database tables created/verified successfully")
     
-    def _generate_content_hash(self, content: str) -> str:
+    def _split_analysis_payload(self, cursor: sqlite3.Cursor):
+        """Move large text columns of an older news_analysis into the payload table."""
+        columns = {row['name'] for row in cursor.execute('PRAGMA table_info(news_analysis)')}
+        if 'news_content' not in columns:
+            return
+        
+        if sqlite3.sqlite_version_info < _DROP_COLUMN_MIN_SQLITE:
+            required = '.'.join(map(str, _DROP_COLUMN_MIN_SQLITE))
+            raise RuntimeError(
+                f"Upgrading {self.db_path} needs SQLite {required} or newer for ALTER TABLE DROP COLUMN; "
+                f"this Python uses SQLite {sqlite3.sqlite_version}"
+            )
+        
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO news_analysis_payload (id, {', '.join(_PAYLOAD_COLUMNS)})
+            SELECT id, {', '.join(_PAYLOAD_COLUMNS)} FROM news_analysis
+        ''')
+        moved = cursor.rowcount
+        for column in _PAYLOAD_COLUMNS:
+            cursor.execute(f'ALTER TABLE news_analysis DROP COLUMN {column}')
+        self.logger.info(f"Moved {moved} analysis payloads to news_analysis_payload")
+    
+    def _create_search_tables(self, cursor: sqlite3.Cursor):
+        """Create the keyword full-text index and the mentioned-sources table."""
+        cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('analysis_fts', 'analysis_mentioned_sources')")
+        existing = {row['name'] for row in cursor.fetchall()}
+        
+        # One row per source named in an analysis, for indexed lookups
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_mentioned_sources (
+                analysis_id INTEGER NOT NULL REFERENCES news_analysis (id) ON DELETE CASCADE,
+                source TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mentioned_sources_source ON analysis_mentioned_sources(source)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mentioned_sources_analysis ON analysis_mentioned_sources(analysis_id)')
+        if 'analysis_mentioned_sources' not in existing:
+            cursor.execute("SELECT id, mentioned_sources FROM news_analysis WHERE mentioned_sources != ''")
+            cursor.executemany(_SQL_INSERT_MENTIONED_SOURCE, (
+                (row['id'], source)
+                for row in cursor.fetchall()
+                for source in self._parse_source_names(row['mentioned_sources'])
+            ))
+        
+        # External-content FTS5 index over news_analysis.keywords, kept in
+        # sync by triggers so every write path (including REPLACE) is covered
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS analysis_fts
+                USING fts5(keywords, content='news_analysis', content_rowid='id')
+            ''')
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"FTS5 unavailable, keyword search disabled: {e}")
+            return
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS news_analysis_fts_insert AFTER INSERT ON news_analysis BEGIN
+                INSERT INTO analysis_fts (rowid, keywords) VALUES (new.id, new.keywords);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS news_analysis_fts_delete AFTER DELETE ON news_analysis BEGIN
+                INSERT INTO analysis_fts (analysis_fts, rowid, keywords) VALUES ('delete', old.id, old.keywords);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS news_analysis_fts_update AFTER UPDATE OF keywords ON news_analysis BEGIN
+                INSERT INTO analysis_fts (analysis_fts, rowid, keywords) VALUES ('delete', old.id, old.keywords);
+                INSERT INTO analysis_fts (rowid, keywords) VALUES (new.id, new.keywords);
+            END
+        ''')
+        if 'analysis_fts' not in existing:
+            cursor.execute("INSERT INTO analysis_fts (analysis_fts) VALUES ('rebuild')")
+    
+    @staticmethod
+    def _parse_source_names(mentioned_sources: Optional[str]) -> List[str]:
+        """Extract the distinct source names from extracted-sources text."""
+        if not mentioned_sources:
+            return []
+        names = (name.strip() for name in _SOURCE_NAME_RE.findall(mentioned_sources))
+        return list(dict.fromkeys(name for name in names if name))
+    
+    def _migrate_content_hashes(self, cursor: sqlite3.Cursor):
+        """Rehash rows still keyed by the old SHA-256 hex digests."""
+        cursor.execute('''
+            SELECT a.id, p.news_content FROM news_analysis a
+            JOIN news_analysis_payload p ON p.id = a.id
+            WHERE typeof(a.content_hash) = 'text'
+        ''')
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        
+        content_hashes = self._generate_content_hashes(row['news_content'] for row in rows)
+        cursor.executemany(
+            'UPDATE news_analysis SET content_hash = ? WHERE id = ?',
+            zip(content_hashes, (row['id'] for row in rows))
+        )
+        self.logger.info(f"Migrated {len(rows)} content hashes to BLAKE2b")
+    
+    def _migrate_timestamps(self, cursor: sqlite3.Cursor):
+        """Convert text timestamps from older schemas to epoch seconds."""
+        # analyzed_date was written from local time, metric timestamps in UTC
+        cursor.execute('''
+            UPDATE news_analysis SET analyzed_date = CAST(strftime('%s', analyzed_date, 'utc') AS INTEGER)
+            WHERE typeof(analyzed_date) = 'text'
+        ''')
+        analyses = cursor.rowcount
+        cursor.execute('''
+            UPDATE performance_metrics SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+            WHERE typeof(timestamp) = 'text'
+        ''')
+        if analyses or cursor.rowcount:
+            self.logger.info(f"Migrated {analyses} analysis and {cursor.rowcount} metric timestamps to epoch seconds")
+    
+    def _generate_content_hash(self, content: str) -> bytes:
         """Generate a hash for content to detect duplicates."""
-        # Normalize content for consistent hashing
-        normalized = content.strip().lower()
-        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return _content_hash(content)
+    
+    def _generate_content_hashes(self, contents: Iterable[str]) -> List[bytes]:
+        """Generate duplicate-detection hashes for many contents at once."""
+        # Bulk contents are rarely repeated, so they bypass the memo
+        content_hash = _content_hash.__wrapped__
+        return [content_hash(content) for content in contents]
     
     def save_analysis(self, user_id: int, news_content: str, news_type: str,
                      keywords: str, mentioned_sources: str, official_sources: List,
@@ -133,68 +636,124 @@ class NewsDatabase:
         """
         try:
             content_hash = self._generate_content_hash(news_content)
+            analyzed_date = int(time.time())
             
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Insert the analysis
-                cursor.execute('''
-                    INSERT OR REPLACE INTO news_analysis 
-                    (user_id, content_hash, news_content, news_type, keywords, mentioned_sources,
-                     official_sources, news_sources, analysis_result, credibility_score, analyzed_date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                # Insert the analysis, then its payload under the same id
+                cursor.execute(_SQL_INSERT_ANALYSIS, (
                     user_id,
                     content_hash,
-                    news_content,
                     news_type,
                     keywords,
                     mentioned_sources,
-                    json.dumps(official_sources, ensure_ascii=False),
-                    json.dumps(news_sources, ensure_ascii=False),
-                    analysis_result,
                     credibility_score,
-                    datetime.now()
+                    analyzed_date
                 ))
                 
                 analysis_id = cursor.lastrowid
+                cursor.execute(_SQL_INSERT_PAYLOAD, (
+                    analysis_id,
+                    news_content,
+                    _json_dumps(official_sources),
+                    _json_dumps(news_sources),
+                    analysis_result
+                ))
+                cursor.executemany(_SQL_INSERT_MENTIONED_SOURCE, (
+                    (analysis_id, source) for source in self._parse_source_names(mentioned_sources)
+                ))
                 
                 # Update user statistics
                 self._update_user_stats(cursor, user_id, credibility_score)
                 
                 conn.commit()
-                self.logger.info(f"Analysis saved successfully with ID: {analysis_id}")
-                return analysis_id
+            
+            self._cache_duplicate(content_hash, {
+                'analysis_result': analysis_result,
+                'credibility_score': credibility_score,
+                'analyzed_date': analyzed_date
+            })
+            self.logger.info(f"Analysis saved successfully with ID: {analysis_id}")
+            return analysis_id
                 
         except Exception as e:
             self.logger.error(f"Error saving analysis: {e}")
             return None
     
-    def _update_user_stats(self, cursor: sqlite3.Cursor, user_id: int, credibility_score: int):
-        """Update user statistics."""
-        # Get current stats
-        cursor.execute('SELECT * FROM user_stats WHERE user_id = ?', (user_id,))
-        stats = cursor.fetchone()
+    def save_analyses_bulk(self, rows: Iterable[tuple]) -> int:
+        """
+        Save many analyses in one transaction.
         
-        current_time = datetime.now()
+        Each row holds the save_analysis arguments in order: user_id,
+        news_content, news_type, keywords, mentioned_sources, official_sources,
+        news_sources, analysis_result, credibility_score.
         
-        if stats:
-            # Update existing stats
-            new_total = stats['total_analyses'] + 1
-            new_avg = ((stats['average_credibility_score'] or 0) * stats['total_analyses'] + credibility_score) / new_total
+        Returns:
+            The number of analyses saved, or 0 if saving failed
+        """
+        try:
+            rows = list(rows)
+            if not rows:
+                return 0
             
-            cursor.execute('''
-                UPDATE user_stats 
-                SET total_analyses = ?, last_analysis_date = ?, average_credibility_score = ?, updated_at = ?
-                WHERE user_id = ?
-            ''', (new_total, current_time, new_avg, current_time, user_id))
-        else:
-            # Create new stats
-            cursor.execute('''
-                INSERT INTO user_stats 
-                (user_id, total_analyses, first_analysis_date, last_analysis_date, average_credibility_score)
-                VALUES (?, 1, ?, ?, ?)
-            ''', (user_id, current_time, current_time, credibility_score))
+            content_hashes = self._generate_content_hashes(row[1] for row in rows)
+            analyzed_date = int(time.time())
+            current_time = datetime.now()
+            
+            # One stats update per user: analysis count and score sum
+            user_totals = {}
+            for row in rows:
+                count, score_sum = user_totals.get(row[0], (0, 0))
+                user_totals[row[0]] = (count + 1, score_sum + row[8])
+            
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(_SQL_INSERT_ANALYSIS, (
+                    (user_id, content_hash, news_type, keywords, mentioned_sources,
+                     credibility_score, analyzed_date)
+                    for content_hash, (user_id, _, news_type, keywords, mentioned_sources,
+                                       _, _, _, credibility_score) in zip(content_hashes, rows)
+                ))
+                cursor.executemany(_SQL_INSERT_PAYLOAD_BY_HASH, (
+                    (
+                        content_hash,
+                        news_content,
+                        _json_dumps(official_sources),
+                        _json_dumps(news_sources),
+                        analysis_result
+                    )
+                    for content_hash, (_, news_content, _, _, _, official_sources, news_sources,
+                                       analysis_result, _) in zip(content_hashes, rows)
+                ))
+                cursor.executemany(_SQL_INSERT_MENTIONED_SOURCE_BY_HASH, (
+                    (content_hash, source)
+                    for content_hash, row in zip(content_hashes, rows)
+                    for source in self._parse_source_names(row[4])
+                ))
+                cursor.executemany(_SQL_UPSERT_USER_STATS, (
+                    (user_id, count, current_time, current_time, score_sum / count)
+                    for user_id, (count, score_sum) in user_totals.items()
+                ))
+                conn.commit()
+            
+            for content_hash, row in zip(content_hashes, rows):
+                self._cache_duplicate(content_hash, {
+                    'analysis_result': row[7],
+                    'credibility_score': row[8],
+                    'analyzed_date': analyzed_date
+                })
+            self.logger.info(f"Saved {len(rows)} analyses in bulk")
+            return len(rows)
+            
+        except Exception as e:
+            self.logger.error(f"Error saving analyses in bulk: {e}")
+            return 0
+    
+    def _update_user_stats(self, cursor: sqlite3.Cursor, user_id: int, credibility_score: int):
+        """Update user statistics."""
+        current_time = datetime.now()
+        cursor.execute(_SQL_UPSERT_USER_STATS, (user_id, 1, current_time, current_time, credibility_score))
     
     def check_duplicate(self, content: str) -> Optional[Dict[str, Any]]:
         """
@@ -206,35 +765,47 @@ class NewsDatabase:
         try:
             content_hash = self._generate_content_hash(content)
             
+            with self._dup_cache_lock:
+                cached = self._dup_cache.get(content_hash)
+                if cached is not None:
+                    if cached[0] > time.monotonic():
+                        self._dup_cache.move_to_end(content_hash)
+                        return dict(cached[1])
+                    del self._dup_cache[content_hash]
+            
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT analysis_result, credibility_score, analyzed_date 
-                    FROM news_analysis 
-                    WHERE content_hash = ? 
-                    ORDER BY analyzed_date DESC 
-                    LIMIT 1
-                ''', (content_hash,))
+                cursor.execute(_SQL_CHECK_DUPLICATE, (content_hash,))
                 
                 result = cursor.fetchone()
                 if result:
-                    return {
+                    duplicate = {
                         'analysis_result': result['analysis_result'],
                         'credibility_score': result['credibility_score'],
                         'analyzed_date': result['analyzed_date']
                     }
+                    self._cache_duplicate(content_hash, duplicate)
+                    return dict(duplicate)
                 return None
                 
         except Exception as e:
             self.logger.error(f"Error checking duplicate: {e}")
             return None
     
+    def _cache_duplicate(self, content_hash: bytes, duplicate: Dict[str, Any]):
+        """Remember a duplicate-check result, evicting the least recently used."""
+        with self._dup_cache_lock:
+            self._dup_cache[content_hash] = (time.monotonic() + _DUPLICATE_CACHE_TTL, duplicate)
+            self._dup_cache.move_to_end(content_hash)
+            while len(self._dup_cache) > _DUPLICATE_CACHE_SIZE:
+                self._dup_cache.popitem(last=False)
+    
     def get_user_stats(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get statistics for a specific user."""
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM user_stats WHERE user_id = ?', (user_id,))
+                cursor.execute(_SQL_SELECT_USER_STATS, (user_id,))
                 
                 result = cursor.fetchone()
                 if result:
@@ -245,23 +816,52 @@ class NewsDatabase:
             self.logger.error(f"Error getting user stats: {e}")
             return None
     
-    def get_user_history(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get analysis history for a user."""
+    def get_user_history(self, user_id: int, limit: int = 10,
+                         before: Optional[Tuple[int, int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a page of analysis history for a user, newest first.
+        
+        To get the next page pass before=(analyzed_date, id) of the last row
+        of the current one.
+        """
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id, news_type, keywords, credibility_score, analyzed_date
-                    FROM news_analysis 
-                    WHERE user_id = ? 
-                    ORDER BY analyzed_date DESC 
-                    LIMIT ?
-                ''', (user_id, limit))
-                
-                return [dict(row) for row in cursor.fetchall()]
+            # Rows are streamed from the cursor instead of fetched into a list
+            if before is None:
+                cursor = self._get_connection().execute(_SQL_USER_HISTORY, (user_id, limit))
+            else:
+                cursor = self._get_connection().execute(
+                    _SQL_USER_HISTORY_BEFORE, (user_id, before[0], before[1], limit)
+                )
+            for row in cursor:
+                yield dict(row)
                 
         except Exception as e:
             self.logger.error(f"Error getting user history: {e}")
+    
+    def search_analyses(self, keywords: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Find analyses whose keywords match, best matches first."""
+        try:
+            # Quote each term so user input is never parsed as FTS5 syntax
+            terms = keywords.split()
+            if not terms:
+                return []
+            query = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+            
+            cursor = self._get_connection().execute(_SQL_SEARCH_KEYWORDS, (query, limit))
+            return [dict(row) for row in cursor.fetchall()]
+            
+        except Exception as e:
+            self.logger.error(f"Error searching analyses: {e}")
+            return []
+    
+    def get_analyses_by_source(self, source: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the latest analyses that mention a source, newest first."""
+        try:
+            cursor = self._get_connection().execute(_SQL_ANALYSES_BY_SOURCE, (source.strip(), limit))
+            return [dict(row) for row in cursor.fetchall()]
+            
+        except Exception as e:
+            self.logger.error(f"Error getting analyses by source: {e}")
             return []
     
     def get_analysis_by_id(self, analysis_id: int) -> Optional[Dict[str, Any]]:
@@ -269,17 +869,12 @@ class NewsDatabase:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM news_analysis WHERE id = ?', (analysis_id,))
+                cursor.execute(_SQL_ANALYSIS_BY_ID, (analysis_id,))
                 
                 result = cursor.fetchone()
                 if result:
-                    analysis = dict(result)
-                    # Parse JSON fields
-                    if analysis['official_sources']:
-                        analysis['official_sources'] = json.loads(analysis['official_sources'])
-                    if analysis['news_sources']:
-                        analysis['news_sources'] = json.loads(analysis['news_sources'])
-                    return analysis
+                    # JSON fields are parsed only if the caller reads them
+                    return LazyAnalysis(result)
                 return None
                 
         except Exception as e:
@@ -288,44 +883,47 @@ class NewsDatabase:
     
     def save_performance_metric(self, operation_type: str, execution_time_ms: float, 
                                success: bool = True, error_details: str = None, user_id: int = None):
-        """Save performance metrics for monitoring."""
-        try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO performance_metrics 
-                    (operation_type, execution_time_ms, success, error_details, user_id)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (operation_type, execution_time_ms, success, error_details, user_id))
-                conn.commit()
-                
-        except Exception as e:
-            self.logger.error(f"Error saving performance metric: {e}")
+        """Queue performance metrics for monitoring; they are written in batches."""
+        self._metrics_queue.append(
+            (operation_type, execution_time_ms, success, error_details, user_id, int(time.time()))
+        )
+        if len(self._metrics_queue) >= _METRICS_BATCH_SIZE:
+            self._metrics_ready.set()
+    
+    def flush_metrics(self):
+        """Write all queued performance metrics."""
+        while self._metrics_queue:
+            rows = []
+            try:
+                # popleft is atomic, so concurrent flushes never write a row twice
+                while self._metrics_queue and len(rows) < _METRICS_BATCH_SIZE:
+                    rows.append(self._metrics_queue.popleft())
+            except IndexError:
+                pass
+            if not rows:
+                return
+            
+            try:
+                with self._get_connection() as conn:
+                    conn.executemany(_SQL_INSERT_METRIC, rows)
+                    
+            except Exception as e:
+                self.logger.error(f"Error saving performance metrics: {e}")
+                return
     
     def get_performance_stats(self, operation_type: Optional[str] = None, 
                             hours_back: int = 24) -> Dict[str, Any]:
         """Get performance statistics."""
+        self.flush_metrics()
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                where_clause = "WHERE timestamp >= datetime('now', '-{} hours')".format(hours_back)
+                cutoff = int(time.time()) - hours_back * 3600
                 if operation_type:
-                    where_clause += f" AND operation_type = '{operation_type}'"
-                
-                cursor.execute(f'''
-                    SELECT 
-                        operation_type,
-                        COUNT(*) as total_operations,
-                        AVG(execution_time_ms) as avg_time,
-                        MIN(execution_time_ms) as min_time,
-                        MAX(execution_time_ms) as max_time,
-                        SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as success_count,
-                        SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as error_count
-                    FROM performance_metrics 
-                    {where_clause}
-                    GROUP BY operation_type
-                ''')
+                    cursor.execute(_SQL_PERFORMANCE_STATS_FOR_TYPE, (cutoff, operation_type))
+                else:
+                    cursor.execute(_SQL_PERFORMANCE_STATS, (cutoff,))
                 
                 results = cursor.fetchall()
                 return {row['operation_type']: dict(row) for row in results}
@@ -334,35 +932,49 @@ class NewsDatabase:
             self.logger.error(f"Error getting performance stats: {e}")
             return {}
     
-    def cleanup_old_data(self, days_old: int = 90):
-        """Clean up old data to maintain database performance."""
+    def cleanup_old_data(self, days_old: int = 90, max_rows: Optional[int] = None) -> int:
+        """
+        Clean up old data to maintain database performance.
+        
+        Rows are deleted in short batches, each in its own transaction. With
+        max_rows set, at most that many rows are deleted per call, so cleanup
+        can run often in small steps.
+        
+        Returns:
+            The number of rows deleted
+        """
+        deleted = 0
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Clean old analyses
-                cursor.execute('''
-                    DELETE FROM news_analysis 
-                    WHERE analyzed_date < datetime('now', '-{} days')
-                '''.format(days_old))
-                
-                # Clean old performance metrics
-                cursor.execute('''
-                    DELETE FROM performance_metrics 
-                    WHERE timestamp < datetime('now', '-{} days')
-                '''.format(days_old))
-                
-                # Clean expired cache entries
-                cursor.execute('''
-                    DELETE FROM analysis_cache 
-                    WHERE expiry_date < datetime('now')
-                ''')
-                
-                conn.commit()
-                self.logger.info(f"Cleaned up data older than {days_old} days")
+            conn = self._get_connection()
+            cutoff = int(time.time()) - days_old * 86400
+            
+            # Old analyses, old performance metrics, expired cache entries
+            for sql, params in (
+                (_SQL_CLEANUP_ANALYSES, (cutoff,)),
+                (_SQL_CLEANUP_METRICS, (cutoff,)),
+                (_SQL_CLEANUP_CACHE, ()),
+            ):
+                while max_rows is None or deleted < max_rows:
+                    batch_size = _CLEANUP_BATCH_SIZE if max_rows is None else min(_CLEANUP_BATCH_SIZE, max_rows - deleted)
+                    with conn:
+                        removed = conn.execute(sql, params + (batch_size,)).rowcount
+                    deleted += removed
+                    if removed < batch_size:
+                        break
+                    # Fold the batch back into the database so the WAL stays small
+                    conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+            
+            self.logger.info(f"Cleaned up {deleted} rows older than {days_old} days")
+            return deleted
                 
         except Exception as e:
             self.logger.error(f"Error during cleanup: {e}")
+            return deleted
+        finally:
+            # Cached duplicates may refer to analyses that were just deleted
+            if deleted:
+                with self._dup_cache_lock:
+                    self._dup_cache.clear()
     
     def get_database_stats(self) -> Dict[str, Any]:
         """Get general database statistics."""
@@ -400,5 +1012,41 @@ class NewsDatabase:
             self.logger.error(f"Error getting database stats: {e}")
             return {}
 
-# Global database instance
-db = NewsDatabase() 
\ No newline at end of file
+_db: Optional[NewsDatabase] = None
+_db_lock = threading.Lock()
+
+def get_db() -> NewsDatabase:
+    """Return the global database instance, creating it on first use."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = NewsDatabase()
+    return _db
+
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the shared executor for blocking database calls."""
+    global _db_executor
+    if _db_executor is None:
+        with _db_lock:
+            if _db_executor is None:
+                _db_executor = ThreadPoolExecutor(
+                    max_workers=_DB_EXECUTOR_WORKERS, thread_name_prefix='newschecker-db'
+                )
+    return _db_executor
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database call without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(func, *args, **kwargs))
+
+def __getattr__(name: str) -> Any:
+    """Create the global database instance lazily on first access."""
+    if name == 'db':
+        global db
+        db = get_db()
+        return db
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+ 
\ No newline at end of file
@@ -26,6 +26,20 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+def install_event_loop_policy():
+    """Run the bot on uvloop when it is enabled and installed."""
+    if not config.ENABLE_UVLOOP:
+        return
+    
+    try:
+        import uvloop
+    except ImportError:
+        enhanced_logger.debug("uvloop not installed, using default asyncio event loop")
+        return
+    
+    uvloop.install()
+    enhanced_logger.info("uvloop event loop policy installed")
+
 def run_bot():
     """Run the Telegram bot."""
     try:
@@ -37,6 +51,9 @@ def run_bot():
         # Initialize rate limiter with admin users
         initialize_rate_limiter(config.ADMIN_USER_IDS)
         
+        # Event loop policy must be set before the application creates its loop
+        install_event_loop_policy()
+        
         # Create and run bot application
         bot_app = BotApplication()
         bot_app.run()
@@ -75,18 +92,53 @@ def run_web():
     finally:
         log_shutdown_info()
 
-def run_both():
-    """Run both bot and web interface."""
-    import threading
+async def _run_both_async():
+    """Serve the bot and the web interface from one event loop."""
+    import uvicorn
+    from src.newschecker.bot.handlers import BotApplication
+    from src.newschecker.web.app import create_app
+    
+    # uvicorn runs the Flask (WSGI) app on its worker threads
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(),
+        host=config.WEB_HOST,
+        port=config.WEB_PORT,
+        interface='wsgi',
+        log_level=config.LOG_LEVEL.lower()
+    ))
     
-    enhanced_logger.info("Starting both bot and web interface...")
+    bot_task = asyncio.create_task(BotApplication().run_async())
+    web_task = asyncio.create_task(server.serve())
     
-    # Start web server in a separate thread
-    web_thread = threading.Thread(target=run_web, daemon=True)
-    web_thread.start()
+    # The web server returns on SIGINT/SIGTERM; either side stopping stops both
+    await asyncio.wait({bot_task, web_task}, return_when=asyncio.FIRST_COMPLETED)
+    if not web_task.done():
+        server.should_exit = True
+    bot_task.cancel()
+    await asyncio.gather(bot_task, web_task, return_exceptions=True)
     
-    # Run bot in main thread
-    run_bot()
+    for task in (bot_task, web_task):
+        if not task.cancelled() and task.exception():
+            raise task.exception()
+
+def run_both():
+    """Run both bot and web interface."""
+    try:
+        log_startup_info()
+        enhanced_logger.info("Starting both bot and web interface...")
+        
+        initialize_rate_limiter(config.ADMIN_USER_IDS)
+        install_event_loop_policy()
+        
+        asyncio.run(_run_both_async())
+        
+    except KeyboardInterrupt:
+        enhanced_logger.info("Shutdown requested by user")
+    except Exception as e:
+        enhanced_logger.critical("Critical error in bot or web server", error=e)
+        raise
+    finally:
+        log_shutdown_info()
 
 def main():
     """Main entry point with command line argument parsing."""
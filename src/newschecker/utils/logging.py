@@ -1,107 +1,227 @@
+import asyncio
+import atexit
+import copy
 import logging
 import json
+import queue
 import time
 import uuid
 import sys
 import traceback
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable
 from functools import wraps
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import threading
 
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+# Optional record attributes copied into structured entries, with the
+# output key for each
+_EXTRA_ATTRS = (
+    ('user_id', 'user_id'),
+    ('request_id', 'request_id'),
+    ('operation', 'operation'),
+    ('duration', 'duration_ms'),
+    ('error', 'error'),
+)
+
+_MISSING = object()
+
+# Request ID of the current thread or asyncio task
+_REQUEST_ID: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+# (second, formatted local time) of the last record timestamp formatted
+_last_second = (None, '')
+
+def _format_created(created: float) -> str:
+    """Format a record's creation time as local ISO 8601 with microseconds."""
+    global _last_second
+    second = int(created)
+    cached_second, prefix = _last_second
+    if second != cached_second:
+        # Records mostly arrive many per second; format each second only once
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+        _last_second = (second, prefix)
+    return f"{prefix}.{int((created - second) * 1_000_000):06d}"
+
+# Record attributes that send an entry down the general dict path
+_OPTIONAL_ATTRS = frozenset([attr for attr, _ in _EXTRA_ATTRS] + ['extra_data'])
+
+def _encode_plain_entry(record, message: str) -> str:
+    """Encode an entry with only the fixed fields, writing their keys as bytes."""
+    dumps = orjson.dumps
+    return b''.join((
+        b'{"timestamp":"', _format_created(record.created).encode(),
+        b'","level":', dumps(record.levelname),
+        b',"logger":', dumps(record.name),
+        b',"message":', dumps(message),
+        b',"module":', dumps(record.module),
+        b',"function":', dumps(record.funcName),
+        b',"line":', dumps(record.lineno),
+        b'}'
+    )).decode('utf-8')
+
+def _dumps_log_entry(log_entry: Dict[str, Any]) -> str:
+    """Serialize a structured log entry, preferring orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(log_entry, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # Types orjson rejects fall back to the stdlib encoder
+    return json.dumps(log_entry, ensure_ascii=False)
+
 class StructuredFormatter(logging.Formatter):
     """Custom formatter for structured JSON logging."""
     
     def format(self, record):
         """Format log record as structured JSON."""
+        # Extra fields live in the record's __dict__; plain dict lookups there
+        # are cheaper than attribute probes
+        record_dict = record.__dict__
+        message = record.getMessage() if record.args else str(record.msg)
+        
+        # Most records carry only the fixed fields; skip building a dict
+        if (orjson is not None and not record.exc_info
+                and record_dict.keys().isdisjoint(_OPTIONAL_ATTRS)):
+            try:
+                return _encode_plain_entry(record, message)
+            except TypeError:
+                pass  # Values orjson rejects take the general path
+        
         log_entry = {
-            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+            'timestamp': _format_created(record.created),
             'level': record.levelname,
             'logger': record.name,
-            'message': record.getMessage(),
+            'message': message,
             'module': record.module,
             'function': record.funcName,
             'line': record.lineno
         }
         
         # Add extra fields if present
-        if hasattr(record, 'user_id'):
-            log_entry['user_id'] = record.user_id
-        if hasattr(record, 'request_id'):
-            log_entry['request_id'] = record.request_id
-        if hasattr(record, 'operation'):
-            log_entry['operation'] = record.operation
-        if hasattr(record, 'duration'):
-            log_entry['duration_ms'] = record.duration
-        if hasattr(record, 'error'):
-            log_entry['error'] = str(record.error)
-        if hasattr(record, 'extra_data'):
-            log_entry.update(record.extra_data)
+        for attr, key in _EXTRA_ATTRS:
+            value = record_dict.get(attr, _MISSING)
+            if value is not _MISSING:
+                log_entry[key] = value
+        if 'error' in log_entry:
+            log_entry['error'] = str(log_entry['error'])
+        extra_data = record_dict.get('extra_data')
+        if extra_data:
+            log_entry.update(extra_data)
         
         # Add exception info if present
         if record.exc_info:
             log_entry['exception'] = self.formatException(record.exc_info)
         
-        return json.dumps(log_entry, ensure_ascii=False)
+        return _dumps_log_entry(log_entry)
+
+class _LocalQueueHandler(QueueHandler):
+    """QueueHandler for a listener in the same process; keeps exc_info intact."""
+    
+    def prepare(self, record):
+        # Resolve the message now, as args may change later, but leave the
+        # exception for the structured formatter instead of flattening it
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class _OperationMetrics:
+    """Running totals of one operation, updated under their own lock."""
+    
+    __slots__ = ('lock', 'count', 'total', 'min', 'max', 'success', 'error')
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.success = 0
+        self.error = 0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy the totals into a metrics dict."""
+        with self.lock:
+            count, total = self.count, self.total
+            min_duration, max_duration = self.min, self.max
+            success_count, error_count = self.success, self.error
+        return {
+            'count': count,
+            'total_duration': total,
+            'avg_duration': total / count if count else 0.0,
+            'min_duration': min_duration,
+            'max_duration': max_duration,
+            'success_count': success_count,
+            'error_count': error_count
+        }
 
 class PerformanceLogger:
     """Logger for performance metrics and monitoring."""
     
+    __slots__ = ('_operations', 'lock')
+    
     def __init__(self):
-        self.metrics = {}
+        # operation -> _OperationMetrics; self.lock only guards adding and
+        # removing operations, so different operations never contend
+        self._operations = {}
         self.lock = threading.Lock()
     
+    def _operation_metrics(self, operation: str) -> _OperationMetrics:
+        """Return the metrics of an operation, creating them once."""
+        metrics = self._operations.get(operation)
+        if metrics is None:
+            with self.lock:
+                metrics = self._operations.get(operation)
+                if metrics is None:
+                    metrics = self._operations[operation] = _OperationMetrics()
+        return metrics
+    
     def record_operation(self, operation: str, duration: float, success: bool = True, **kwargs):
         """Record operation performance metrics."""
-        with self.lock:
-            if operation not in self.metrics:
-                self.metrics[operation] = {
-                    'count': 0,
-                    'total_duration': 0.0,
-                    'avg_duration': 0.0,
-                    'min_duration': float('inf'),
-                    'max_duration': 0.0,
-                    'success_count': 0,
-                    'error_count': 0
-                }
-            
-            metric = self.metrics[operation]
-            metric['count'] += 1
-            metric['total_duration'] += duration
-            metric['avg_duration'] = metric['total_duration'] / metric['count']
-            metric['min_duration'] = min(metric['min_duration'], duration)
-            metric['max_duration'] = max(metric['max_duration'], duration)
+        metrics = self._operation_metrics(operation)
+        with metrics.lock:
+            metrics.count += 1
+            metrics.total += duration
+            if duration < metrics.min:
+                metrics.min = duration
+            if duration > metrics.max:
+                metrics.max = duration
             
             if success:
-                metric['success_count'] += 1
+                metrics.success += 1
             else:
-                metric['error_count'] += 1
+                metrics.error += 1
     
     def get_metrics(self, operation: Optional[str] = None) -> Dict[str, Any]:
         """Get performance metrics."""
-        with self.lock:
-            if operation:
-                return self.metrics.get(operation, {})
-            return self.metrics.copy()
+        if operation:
+            metrics = self._operations.get(operation)
+            return metrics.snapshot() if metrics else {}
+        return {name: metrics.snapshot() for name, metrics in list(self._operations.items())}
     
     def reset_metrics(self, operation: Optional[str] = None):
         """Reset performance metrics."""
         with self.lock:
             if operation:
-                if operation in self.metrics:
-                    del self.metrics[operation]
+                self._operations.pop(operation, None)
             else:
-                self.metrics.clear()
+                self._operations.clear()
 
 class EnhancedLogger:
     """Enhanced logging system with structured logging and performance monitoring."""
     
     def __init__(self, name: str = 'newschecker'):
         self.logger = logging.getLogger(name)
+        self._perf_logger = logging.getLogger(f'{name}.performance')
         self.performance_logger = PerformanceLogger()
-        self.request_context = threading.local()
+        self._listener = None
         
         # Configure logger if not already configured
         if not self.logger.handlers:
@@ -135,7 +255,6 @@ class EnhancedLogger:
         )
         main_handler.setLevel(logging.DEBUG)
         main_handler.setFormatter(structured_formatter)
-        self.logger.addHandler(main_handler)
         
         # Error log file
         error_handler = RotatingFileHandler(
@@ -145,7 +264,6 @@ class EnhancedLogger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(structured_formatter)
-        self.logger.addHandler(error_handler)
         
         # Performance log file
         perf_handler = RotatingFileHandler(
@@ -156,30 +274,51 @@ class EnhancedLogger:
         perf_handler.setLevel(logging.INFO)
         perf_handler.setFormatter(structured_formatter)
         
-        # Create performance logger
-        perf_logger = logging.getLogger(f'{self.logger.name}.performance')
-        perf_logger.addHandler(perf_handler)
+        # Create performance logger; its records propagate to the queue, and
+        # only they reach the performance log
+        perf_logger = self._perf_logger
         perf_logger.setLevel(logging.INFO)
+        perf_handler.addFilter(logging.Filter(perf_logger.name))
+        
+        # File writes happen on a background listener thread; logging calls
+        # only enqueue the record
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(_LocalQueueHandler(log_queue))
+        self._listener = QueueListener(
+            log_queue, main_handler, error_handler, perf_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self.close)
+    
+    def close(self):
+        """Write out queued records and stop the background log writer."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
     
     def set_request_id(self, request_id: Optional[str] = None):
-        """Set request ID for current thread context."""
+        """Set request ID for the current thread or task context."""
         if request_id is None:
             request_id = str(uuid.uuid4())
-        self.request_context.request_id = request_id
+        _REQUEST_ID.set(request_id)
         return request_id
     
     def get_request_id(self) -> Optional[str]:
         """Get current request ID."""
-        return getattr(self.request_context, 'request_id', None)
+        return _REQUEST_ID.get()
     
     def _log_with_context(self, level: int, message: str, **kwargs):
         """Log message with context information."""
-        extra = {}
+        if not self.logger.isEnabledFor(level):
+            return
+        
+        request_id = _REQUEST_ID.get()
+        if not request_id and not kwargs:
+            self.logger.log(level, message)
+            return
         
         # Add request ID if available
-        request_id = self.get_request_id()
-        if request_id:
-            extra['request_id'] = request_id
+        extra = {'request_id': request_id} if request_id else {}
         
         # Add any additional context
         if kwargs:
@@ -205,8 +344,10 @@ class EnhancedLogger:
         if error:
             extra['error'] = str(error)
             extra['error_type'] = type(error).__name__
-            # Add traceback for exceptions
-            extra['traceback'] = traceback.format_exc()
+            # Add traceback for exceptions; outside an except block there is
+            # none, and format_exc would only walk frames to say so
+            if sys.exc_info()[0] is not None:
+                extra['traceback'] = traceback.format_exc()
         
         self._log_with_context(logging.ERROR, message, **extra)
     
@@ -216,7 +357,8 @@ class EnhancedLogger:
         if error:
             extra['error'] = str(error)
             extra['error_type'] = type(error).__name__
-            extra['traceback'] = traceback.format_exc()
+            if sys.exc_info()[0] is not None:
+                extra['traceback'] = traceback.format_exc()
         
         self._log_with_context(logging.CRITICAL, message, **extra)
     
@@ -233,6 +375,10 @@ class EnhancedLogger:
         """Log performance metrics."""
         self.performance_logger.record_operation(operation, duration, success, **kwargs)
         
+        perf_logger = self._perf_logger
+        if not perf_logger.isEnabledFor(logging.INFO):
+            return
+        
         extra = {
             'operation': operation,
             'duration': duration,
@@ -240,7 +386,6 @@ class EnhancedLogger:
         }
         extra.update(kwargs)
         
-        perf_logger = logging.getLogger(f'{self.logger.name}.performance')
         perf_logger.info(f"Performance: {operation}", extra=extra)
     
     def log_security_event(self, event_type: str, user_id: int, details: Dict[str, Any]):
@@ -267,34 +412,65 @@ def performance_monitor(operation_name: str):
         operation_name: Name of the operation for metrics
     """
     def decorator(func: Callable) -> Callable:
+        def start():
+            # Nested monitored calls keep the outermost request ID
+            token = None
+            if _REQUEST_ID.get() is None:
+                token = _REQUEST_ID.set(str(uuid.uuid4()))
+            if enhanced_logger.logger.isEnabledFor(logging.DEBUG):
+                enhanced_logger.debug(f"Starting operation: {operation_name}", 
+                                    operation=operation_name)
+            return token, time.monotonic_ns()
+        
+        def fail(error: Exception):
+            enhanced_logger.error(f"Error in operation: {operation_name}", 
+                                error=error, operation=operation_name)
+        
+        def finish(token, start_time: int, success: bool):
+            duration = (time.monotonic_ns() - start_time) / 1_000_000  # Convert to milliseconds
+            enhanced_logger.log_performance(operation_name, duration, success)
+            
+            if enhanced_logger.logger.isEnabledFor(logging.DEBUG):
+                enhanced_logger.debug(f"Completed operation: {operation_name}", 
+                                    operation=operation_name, 
+                                    duration_ms=duration,
+                                    success=success)
+            if token is not None:
+                _REQUEST_ID.reset(token)
+        
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            start_time = time.time()
-            request_id = enhanced_logger.set_request_id()
+        async def async_wrapper(*args, **kwargs):
+            token, start_time = start()
             success = True
-            error = None
             
             try:
-                enhanced_logger.debug(f"Starting operation: {operation_name}", 
-                                    operation=operation_name)
-                result = func(*args, **kwargs)
-                return result
+                return await func(*args, **kwargs)
             except Exception as e:
                 success = False
-                error = e
-                enhanced_logger.error(f"Error in operation: {operation_name}", 
-                                    error=e, operation=operation_name)
+                fail(e)
                 raise
             finally:
-                duration = (time.time() - start_time) * 1000  # Convert to milliseconds
-                enhanced_logger.log_performance(operation_name, duration, success)
-                
-                enhanced_logger.debug(f"Completed operation: {operation_name}", 
-                                    operation=operation_name, 
-                                    duration_ms=duration,
-                                    success=success)
+                finish(token, start_time, success)
+        
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            token, start_time = start()
+            success = True
+            
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                success = False
+                fail(e)
+                raise
+            finally:
+                finish(token, start_time, success)
         
-        return wrapper
+        # Time coroutines until they finish, not until they are created
+        if asyncio.iscoroutinefunction(func):
+            return async_wrapper
+        else:
+            return sync_wrapper
     return decorator
 
 def log_startup_info():
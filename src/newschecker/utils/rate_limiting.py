@@ -1,29 +1,70 @@
+import asyncio
+import inspect
 import time
 import threading
-from collections import defaultdict, deque
+from collections import defaultdict
 from typing import Dict, Tuple, Any, Optional
 from functools import wraps
 from datetime import datetime, timedelta
 
+class _TokenBucket:
+    """Request allowance of one user, or of all users, for one operation."""
+    
+    __slots__ = ('tokens', 'last_refill')
+    
+    def __init__(self, tokens: float, last_refill: float):
+        self.tokens = tokens
+        self.last_refill = last_refill
+
+# Number of lock stripes users are spread over; must be a power of two
+_SHARD_COUNT = 16
+
+# Least recently used buckets checked for idleness on each request
+_IDLE_BUCKETS_CHECKED = 2
+
 class RateLimiter:
     """
     Advanced rate limiting system with per-user and operation-specific limits.
     
     Features:
-    - Sliding window rate limiting
+    - Token-bucket rate limiting: a limit of N per window allows bursts of up
+      to N and refills at N per window, a close, O(1) approximation of a
+      sliding window
     - Per-operation limits (text, URL, image analysis)
     - VIP user support with multipliers
-    - Automatic cleanup of old entries
-    - Thread-safe operations
+    - Incremental cleanup of idle buckets
+    - Thread-safe operations with per-shard locks
     - Comprehensive statistics
     """
     
     def __init__(self):
-        self.user_operations = defaultdict(lambda: defaultdict(deque))
-        self.global_operations = defaultdict(deque)
-        self.lock = threading.RLock()
-        self.cleanup_interval = 300  # 5 minutes
-        self.last_cleanup = time.time()
+        # Users are striped over shards by id, each with its own lock, buckets
+        # ((user_id, operation) -> _TokenBucket, least recently used first),
+        # operations with a bucket per user and counters, so requests of
+        # unrelated users do not contend
+        self._shards = [
+            {
+                'lock': threading.Lock(),
+                'buckets': {},
+                'user_operations': {},
+                'user_stats': defaultdict(lambda: {'requests': 0, 'blocked': 0}),
+                'operations_count': defaultdict(int),
+                'total_requests': 0,
+                'blocked_requests': 0
+            }
+            for _ in range(_SHARD_COUNT)
+        ]
+        
+        # operation -> (lock, _TokenBucket) shared by all users, so requests
+        # for different operations do not contend; entries are never removed.
+        # _global_lock only guards adding entries. Both are only taken inside
+        # a shard lock, never the other way round
+        self.global_operations = {}
+        self._global_lock = threading.Lock()
+        
+        # Serializes configuration changes; readers use the current objects,
+        # which are replaced rather than mutated
+        self.lock = threading.Lock()
         
         # Rate limits per operation (requests per minute)
         self.operation_limits = {
@@ -43,71 +84,76 @@ class RateLimiter:
         
         # VIP users (admin multiplier)
         self.vip_multiplier = 5
-        self.vip_users = set()  # Will be populated from config
+        self.vip_users = frozenset()  # Will be populated from config
         
         # Window size in seconds
         self.window_size = 60
-        
-        # Statistics
-        self.stats = {
-            'total_requests': 0,
-            'blocked_requests': 0,
-            'operations_count': defaultdict(int),
-            'user_stats': defaultdict(lambda: {'requests': 0, 'blocked': 0})
-        }
+    
+    def _shard_for(self, user_id: int) -> Dict[str, Any]:
+        """Return the shard holding a user's buckets and counters."""
+        return self._shards[hash(user_id) & (_SHARD_COUNT - 1)]
     
     def add_vip_user(self, user_id: int):
         """Add VIP user (admin user)."""
         with self.lock:
-            self.vip_users.add(user_id)
+            self.vip_users = self.vip_users | {user_id}
     
     def remove_vip_user(self, user_id: int):
         """Remove VIP user."""
         with self.lock:
-            self.vip_users.discard(user_id)
+            self.vip_users = self.vip_users - {user_id}
     
     def is_vip_user(self, user_id: int) -> bool:
         """Check if user is VIP."""
         return user_id in self.vip_users
     
-    def _cleanup_old_entries(self):
-        """Clean up old entries beyond the window."""
-        current_time = time.time()
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
-        
+    def _available(self, bucket: Optional[_TokenBucket], limit: int, current_time: float) -> float:
+        """Tokens a bucket would hold after refilling up to current_time."""
+        if bucket is None:
+            return float(limit)
+        refilled = (current_time - bucket.last_refill) * limit / self.window_size
+        return min(float(limit), bucket.tokens + refilled)
+    
+    def _retry_after(self, bucket: _TokenBucket, limit: int) -> float:
+        """Seconds until a bucket refills to one whole token."""
+        return max(0.0, (1.0 - bucket.tokens) * self.window_size / limit)
+    
+    def _global_entry(self, operation: str, limit: int, current_time: float) -> Tuple[threading.Lock, _TokenBucket]:
+        """Return the (lock, bucket) pair for an operation, creating it once."""
+        entry = self.global_operations.get(operation)
+        if entry is None:
+            with self._global_lock:
+                entry = self.global_operations.get(operation)
+                if entry is None:
+                    entry = (threading.Lock(), _TokenBucket(float(limit), current_time))
+                    self.global_operations[operation] = entry
+        return entry
+    
+    def _evict_idle_buckets(self, shard: Dict[str, Any], current_time: float):
+        """Drop a shard's least recently used buckets once idle for a full window."""
+        # They would be full again anyway; a few checks per request keep the
+        # shard bounded without a periodic sweep
         cutoff_time = current_time - self.window_size
-        
-        # Clean user operations
-        for user_id in list(self.user_operations.keys()):
-            for operation in list(self.user_operations[user_id].keys()):
-                queue = self.user_operations[user_id][operation]
-                while queue and queue[0] < cutoff_time:
-                    queue.popleft()
-                
-                # Remove empty queues
-                if not queue:
-                    del self.user_operations[user_id][operation]
+        buckets = shard['buckets']
+        user_operations = shard['user_operations']
+        for _ in range(_IDLE_BUCKETS_CHECKED):
+            if not buckets:
+                return
+            key = next(iter(buckets))
+            if buckets[key].last_refill >= cutoff_time:
+                return
+            del buckets[key]
             
-            # Remove empty user entries
-            if not self.user_operations[user_id]:
-                del self.user_operations[user_id]
-        
-        # Clean global operations
-        for operation in list(self.global_operations.keys()):
-            queue = self.global_operations[operation]
-            while queue and queue[0] < cutoff_time:
-                queue.popleft()
-            
-            # Remove empty queues
-            if not queue:
-                del self.global_operations[operation]
-        
-        self.last_cleanup = current_time
+            user_id, operation = key
+            operations = user_operations[user_id]
+            operations.discard(operation)
+            if not operations:
+                del user_operations[user_id]
     
     def _get_user_limit(self, user_id: int, operation: str) -> int:
         """Get rate limit for user and operation."""
-        base_limit = self.operation_limits.get(operation, self.operation_limits['general'])
+        operation_limits = self.operation_limits
+        base_limit = operation_limits.get(operation, operation_limits['general'])
         
         if self.is_vip_user(user_id):
             return base_limit * self.vip_multiplier
@@ -116,7 +162,8 @@ class RateLimiter:
     
     def _get_global_limit(self, operation: str) -> int:
         """Get global rate limit for operation."""
-        return self.global_limits.get(operation, self.global_limits['general'])
+        global_limits = self.global_limits
+        return global_limits.get(operation, global_limits['general'])
     
     def is_allowed(self, user_id: int, operation: str = 'general') -> Dict[str, Any]:
         """
@@ -129,82 +176,88 @@ class RateLimiter:
         Returns:
             Dict with 'allowed' boolean and additional info
         """
-        with self.lock:
-            current_time = time.time()
-            self._cleanup_old_entries()
+        shard = self._shard_for(user_id)
+        user_limit = self._get_user_limit(user_id, operation)
+        global_limit = self._get_global_limit(operation)
+        
+        with shard['lock']:
+            current_time = time.monotonic()
+            self._evict_idle_buckets(shard, current_time)
             
             # Update statistics
-            self.stats['total_requests'] += 1
-            self.stats['operations_count'][operation] += 1
-            self.stats['user_stats'][user_id]['requests'] += 1
-            
-            # Check user-specific limit
-            user_queue = self.user_operations[user_id][operation]
-            user_limit = self._get_user_limit(user_id, operation)
+            user_stats = shard['user_stats'][user_id]
+            shard['total_requests'] += 1
+            shard['operations_count'][operation] += 1
+            user_stats['requests'] += 1
             
-            # Count requests in current window
-            cutoff_time = current_time - self.window_size
-            user_requests_in_window = sum(1 for timestamp in user_queue if timestamp > cutoff_time)
+            # Check user-specific limit; re-inserting moves the bucket to the
+            # most recently used end
+            key = (user_id, operation)
+            buckets = shard['buckets']
+            user_bucket = buckets.pop(key, None)
+            if user_bucket is None:
+                user_bucket = _TokenBucket(float(user_limit), current_time)
+                shard['user_operations'].setdefault(user_id, set()).add(operation)
+            else:
+                user_bucket.tokens = self._available(user_bucket, user_limit, current_time)
+                user_bucket.last_refill = current_time
+            buckets[key] = user_bucket
             
-            if user_requests_in_window >= user_limit:
-                self.stats['blocked_requests'] += 1
-                self.stats['user_stats'][user_id]['blocked'] += 1
-                
-                # Calculate retry after time
-                oldest_in_window = min((t for t in user_queue if t > cutoff_time), default=current_time)
-                retry_after = self.window_size - (current_time - oldest_in_window)
+            if user_bucket.tokens < 1:
+                shard['blocked_requests'] += 1
+                user_stats['blocked'] += 1
                 
                 return {
                     'allowed': False,
                     'reason': 'user_limit_exceeded',
                     'limit': user_limit,
-                    'current_count': user_requests_in_window,
-                    'retry_after': max(0, retry_after),
+                    'current_count': user_limit - int(user_bucket.tokens),
+                    'retry_after': self._retry_after(user_bucket, user_limit),
                     'is_vip': self.is_vip_user(user_id)
                 }
             
-            # Check global limit
-            global_queue = self.global_operations[operation]
-            global_limit = self._get_global_limit(operation)
-            global_requests_in_window = sum(1 for timestamp in global_queue if timestamp > cutoff_time)
+            # Check global limit, taking a token right away if one is left
+            global_lock, global_bucket = self._global_entry(operation, global_limit, current_time)
+            with global_lock:
+                global_bucket.tokens = self._available(global_bucket, global_limit, current_time)
+                global_bucket.last_refill = current_time
+                global_allowed = global_bucket.tokens >= 1
+                if global_allowed:
+                    global_bucket.tokens -= 1
+                global_tokens = global_bucket.tokens
             
-            if global_requests_in_window >= global_limit:
-                self.stats['blocked_requests'] += 1
-                self.stats['user_stats'][user_id]['blocked'] += 1
-                
-                # Calculate retry after time
-                oldest_in_window = min((t for t in global_queue if t > cutoff_time), default=current_time)
-                retry_after = self.window_size - (current_time - oldest_in_window)
+            if not global_allowed:
+                shard['blocked_requests'] += 1
+                user_stats['blocked'] += 1
                 
                 return {
                     'allowed': False,
                     'reason': 'global_limit_exceeded',
                     'limit': global_limit,
-                    'current_count': global_requests_in_window,
-                    'retry_after': max(0, retry_after),
+                    'current_count': global_limit - int(global_tokens),
+                    'retry_after': max(0.0, (1.0 - global_tokens) * self.window_size / global_limit),
                     'is_vip': self.is_vip_user(user_id)
                 }
             
             # Allow request and record it
-            user_queue.append(current_time)
-            global_queue.append(current_time)
+            user_bucket.tokens -= 1
             
             return {
                 'allowed': True,
                 'user_limit': user_limit,
-                'user_remaining': user_limit - user_requests_in_window - 1,
+                'user_remaining': int(user_bucket.tokens),
                 'global_limit': global_limit,
-                'global_remaining': global_limit - global_requests_in_window - 1,
+                'global_remaining': int(global_tokens),
                 'is_vip': self.is_vip_user(user_id)
             }
     
     def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Get statistics for a specific user."""
-        with self.lock:
-            current_time = time.time()
-            cutoff_time = current_time - self.window_size
+        shard = self._shard_for(user_id)
+        with shard['lock']:
+            current_time = time.monotonic()
             
-            user_operations = self.user_operations.get(user_id, {})
+            buckets = shard['buckets']
             stats = {
                 'user_id': user_id,
                 'is_vip': self.is_vip_user(user_id),
@@ -213,17 +266,16 @@ class RateLimiter:
             
             for operation, limit in self.operation_limits.items():
                 user_limit = self._get_user_limit(user_id, operation)
-                queue = user_operations.get(operation, deque())
-                current_count = sum(1 for timestamp in queue if timestamp > cutoff_time)
+                remaining = int(self._available(buckets.get((user_id, operation)), user_limit, current_time))
                 
                 stats['operations'][operation] = {
                     'limit': user_limit,
-                    'current': current_count,
-                    'remaining': max(0, user_limit - current_count)
+                    'current': user_limit - remaining,
+                    'remaining': remaining
                 }
             
             # Add overall user statistics
-            user_stats = self.stats['user_stats'][user_id]
+            user_stats = shard['user_stats'].get(user_id, {'requests': 0, 'blocked': 0})
             stats['total_requests'] = user_stats['requests']
             stats['blocked_requests'] = user_stats['blocked']
             
@@ -231,62 +283,99 @@ class RateLimiter:
     
     def get_global_stats(self) -> Dict[str, Any]:
         """Get global rate limiting statistics."""
-        with self.lock:
-            current_time = time.time()
-            cutoff_time = current_time - self.window_size
+        total_requests = blocked_requests = active_users = 0
+        operations_count = defaultdict(int)
+        for shard in self._shards:
+            with shard['lock']:
+                total_requests += shard['total_requests']
+                blocked_requests += shard['blocked_requests']
+                active_users += len(shard['user_operations'])
+                for operation, count in shard['operations_count'].items():
+                    operations_count[operation] += count
+        
+        global_stats = {
+            'total_requests': total_requests,
+            'blocked_requests': blocked_requests,
+            'active_users': active_users,
+            'vip_users_count': len(self.vip_users),
+            'operations': {}
+        }
+        
+        current_time = time.monotonic()
+        for operation, limit in self.global_limits.items():
+            entry = self.global_operations.get(operation)
+            if entry is None:
+                remaining = limit
+            else:
+                with entry[0]:
+                    remaining = int(self._available(entry[1], limit, current_time))
             
-            global_stats = {
-                'total_requests': self.stats['total_requests'],
-                'blocked_requests': self.stats['blocked_requests'],
-                'active_users': len(self.user_operations),
-                'vip_users_count': len(self.vip_users),
-                'operations': {}
+            global_stats['operations'][operation] = {
+                'limit': limit,
+                'current': limit - remaining,
+                'remaining': remaining,
+                'total_requests': operations_count[operation]
             }
-            
-            for operation, limit in self.global_limits.items():
-                queue = self.global_operations.get(operation, deque())
-                current_count = sum(1 for timestamp in queue if timestamp > cutoff_time)
-                
-                global_stats['operations'][operation] = {
-                    'limit': limit,
-                    'current': current_count,
-                    'remaining': max(0, limit - current_count),
-                    'total_requests': self.stats['operations_count'][operation]
-                }
-            
-            return global_stats
+        
+        return global_stats
     
     def reset_user_limits(self, user_id: int, operation: Optional[str] = None):
         """Reset rate limits for a user."""
-        with self.lock:
-            if user_id in self.user_operations:
-                if operation:
-                    if operation in self.user_operations[user_id]:
-                        self.user_operations[user_id][operation].clear()
-                else:
-                    del self.user_operations[user_id]
+        shard = self._shard_for(user_id)
+        with shard['lock']:
+            operations = shard['user_operations'].get(user_id)
+            if operations:
+                for name in ([operation] if operation else list(operations)):
+                    if shard['buckets'].pop((user_id, name), None) is not None:
+                        operations.discard(name)
+                if not operations:
+                    del shard['user_operations'][user_id]
     
     def reset_global_limits(self, operation: Optional[str] = None):
         """Reset global rate limits."""
-        with self.lock:
-            if operation:
-                if operation in self.global_operations:
-                    self.global_operations[operation].clear()
-            else:
-                self.global_operations.clear()
+        operations = [operation] if operation else list(self.global_operations)
+        for name in operations:
+            entry = self.global_operations.get(name)
+            if entry is not None:
+                with entry[0]:
+                    entry[1].tokens = float(self._get_global_limit(name))
     
     def update_limits(self, operation_limits: Optional[Dict[str, int]] = None, 
                      global_limits: Optional[Dict[str, int]] = None):
         """Update rate limits dynamically."""
         with self.lock:
             if operation_limits:
-                self.operation_limits.update(operation_limits)
+                self.operation_limits = {**self.operation_limits, **operation_limits}
             if global_limits:
-                self.global_limits.update(global_limits)
+                self.global_limits = {**self.global_limits, **global_limits}
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
 
+def _update_position(func) -> int:
+    """Return the position of a handler's Update argument, defaulting to the first."""
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return 0
+    
+    for position, parameter in enumerate(parameters):
+        annotation = parameter.annotation
+        annotation_name = annotation if isinstance(annotation, str) else getattr(annotation, '__name__', None)
+        if parameter.name == 'update' or annotation_name == 'Update':
+            return position
+    return 0
+
+def _find_user_id(args) -> Optional[int]:
+    """Extract user_id from the first argument that looks like an Update."""
+    for arg in args:
+        user = getattr(arg, 'effective_user', None)
+        if user is not None:
+            user_id = getattr(user, 'id', None)
+            if user_id is not None:
+                return user_id
+    return None
+
 def rate_limit_check(operation: str = 'general'):
     """
     Decorator for rate limiting function calls.
@@ -295,21 +384,28 @@ def rate_limit_check(operation: str = 'general'):
         operation: Operation type for rate limiting
     """
     def decorator(func):
+        # Resolved once per handler so calls read the Update directly
+        update_position = _update_position(func)
+        is_allowed = rate_limiter.is_allowed
+        
+        def get_user_id(args) -> Optional[int]:
+            try:
+                user = args[update_position].effective_user
+            except (IndexError, AttributeError):
+                return _find_user_id(args)
+            return user.id if user is not None else None
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             # Extract user_id from args (assumes it's in Update object)
-            user_id = None
-            for arg in args:
-                if hasattr(arg, 'effective_user') and hasattr(arg.effective_user, 'id'):
-                    user_id = arg.effective_user.id
-                    break
+            user_id = get_user_id(args)
             
             if user_id is None:
                 # If no user_id found, proceed without rate limiting
                 return await func(*args, **kwargs)
             
             # Check rate limit
-            rate_check = rate_limiter.is_allowed(user_id, operation)
+            rate_check = is_allowed(user_id, operation)
             if not rate_check['allowed']:
                 # Handle rate limit exceeded (this would be customized based on framework)
                 return None
@@ -319,24 +415,19 @@ def rate_limit_check(operation: str = 'general'):
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             # Extract user_id from args
-            user_id = None
-            for arg in args:
-                if hasattr(arg, 'effective_user') and hasattr(arg.effective_user, 'id'):
-                    user_id = arg.effective_user.id
-                    break
+            user_id = get_user_id(args)
             
             if user_id is None:
                 return func(*args, **kwargs)
             
             # Check rate limit
-            rate_check = rate_limiter.is_allowed(user_id, operation)
+            rate_check = is_allowed(user_id, operation)
             if not rate_check['allowed']:
                 return None
             
             return func(*args, **kwargs)
         
         # Return appropriate wrapper based on function type
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
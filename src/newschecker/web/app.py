@@ -5,17 +5,41 @@ This module provides a web interface for news analysis.
 """
 
 from flask import Flask, render_template, request, jsonify
+import atexit
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Import from new structure
 from ..config.settings import config
 from ..core.analyzer import credibility_analyzer
-from ..core.database import db
+from ..core.database import get_db, format_timestamp, get_db_executor
 from ..core.cache import news_cache
 from ..utils.security import security_validator
 from ..utils.logging import enhanced_logger
 
+# Saves web analyses after the response is sent; one worker keeps writes in
+# order, and pending saves finish before the process exits
+_save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='newschecker-web-save')
+atexit.register(_save_executor.shutdown, wait=True)
+
+def _format_analysis_text(credibility_analysis: dict) -> str:
+    """Format a credibility analysis as the plain-text web analysis result."""
+    warning_flags = credibility_analysis['warning_flags']
+    warning_flags = '\n'.join(warning_flags) if warning_flags else 'None detected'
+    recommendations = '\n'.join(credibility_analysis['recommendations'])
+    return f"""Web Analysis Results:
+
+Content Analysis Score: {credibility_analysis['final_score']:.1f}/10
+Credibility Level: {credibility_analysis['credibility_level']}
+
+Warning Flags:
+{warning_flags}
+
+Recommendations:
+{recommendations}
+"""
+
 def create_app():
     """Create and configure the Flask application."""
     app = Flask(__name__)
@@ -81,41 +105,36 @@ def create_app():
                     'cached': True
                 })
             
-            # Check database for duplicates
-            duplicate_check = db.check_duplicate(content)
+            # Check database for duplicates on a database thread while the
+            # analysis runs here; a duplicate still takes precedence
+            duplicate_future = get_db_executor().submit(get_db().check_duplicate, content)
+            
+            # Perform new analysis - simplified for web interface
+            credibility_analysis = credibility_analyzer.analyze_credibility(
+                content, {'official_sources': [], 'news_sources': [], 'keywords': ''}, ''
+            )
+            
+            duplicate_check = duplicate_future.result()
             if duplicate_check:
                 enhanced_logger.debug("Using database duplicate for web request")
                 return jsonify({
                     'success': True,
                     'analysis': duplicate_check['analysis_result'],
                     'credibility_score': duplicate_check['credibility_score'],
-                    'analyzed_date': duplicate_check['analyzed_date'],
+                    'analyzed_date': format_timestamp(duplicate_check['analyzed_date']),
                     'from_database': True
                 })
             
-            # Perform new analysis - simplified for web interface
-            credibility_analysis = credibility_analyzer.analyze_credibility(
-                content, {'official_sources': [], 'news_sources': [], 'keywords': ''}, ''
-            )
-            
             # Create a simple analysis result
-            analysis_result = f"""Web Analysis Results:
-
-Content Analysis Score: {credibility_analysis['final_score']:.1f}/10
-Credibility Level: {credibility_analysis['credibility_level']}
-
-Warning Flags:
-{chr(10).join(credibility_analysis['warning_flags']) if credibility_analysis['warning_flags'] else 'None detected'}
-
-Recommendations:
-{chr(10).join(credibility_analysis['recommendations'])}
-"""
+            analysis_result = _format_analysis_text(credibility_analysis)
             
-            # Cache the result
+            # Cache the result; it is in memory, so repeats see it at once
             news_cache.cache_analysis(content, analysis_result)
             
-            # Save to database (with anonymous user_id)
-            db.save_analysis(
+            # Save to database (with anonymous user_id) without holding up
+            # the response; save_analysis logs its own failures
+            _save_executor.submit(
+                get_db().save_analysis,
                 user_id=0,  # Anonymous web user
                 news_content=content,
                 news_type='web_text',
@@ -147,7 +166,7 @@ Recommendations:
         """Health check endpoint."""
         try:
             # Test database connection
-            db_stats = db.get_database_stats()
+            db_stats = get_db().get_database_stats()
             
             # Test cache
             cache_stats = news_cache.get_stats()
@@ -171,7 +190,7 @@ Recommendations:
     def stats():
         """Statistics endpoint."""
         try:
-            db_stats = db.get_database_stats()
+            db_stats = get_db().get_database_stats()
             cache_stats = news_cache.get_stats()
             
             return jsonify({
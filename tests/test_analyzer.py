@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+# Add the src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from newschecker.core.analyzer import CredibilityAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    return CredibilityAnalyzer()
+
+
+def test_overlapping_warning_categories_all_count(analyzer):
+    """A phrase matching patterns in two categories flags and deducts for both"""
+    content = "This is EXCLUSIVE sources report about the ongoing events in the region today."
+    result = analyzer.analyze_credibility(content, {}, '')
+
+    assert sorted(result['warning_flags']) == sorted([
+        '⚠️ Sensasiyalı dil istifadə edilib',
+        '⚠️ Təsdiqlənməmiş iddialar'
+    ])
+    # 8.0 base, minus 0.5 for EXCLUSIVE and 0.5 for "exclusive sources"
+    assert result['language_score'] == pytest.approx(7.0)
+    assert result['final_score'] == pytest.approx(5.35)
+
+
+
+def test_overlapping_mentioned_source_categories_all_count(analyzer):
+    """A trusted source overlapping a ministry or official mention scores both"""
+    content = "Officials confirmed the new budget figures for the coming year in a statement."
+
+    # 5.0 base, +1.0 for the trusted source, +0.5 for the ministry or official mention
+    for mentioned_sources in ('cnnazirlik', 'bbcofficial'):
+        result = analyzer.analyze_credibility(content, {}, mentioned_sources)
+        assert result['source_score'] == pytest.approx(6.5), mentioned_sources
+
+def test_malformed_source_link_keeps_source_score(analyzer):
+    """A link urlsplit cannot parse still counts as its own source domain"""
+    content = "Officials confirmed the new budget figures for the coming year in a statement."
+    search_results = {'news_sources': [
+        {'link': 'http://[bad/x', 'snippet': ''},
+        {'link': 'https://trend.az/news/1', 'snippet': ''}
+    ]}
+
+    result = analyzer.analyze_credibility(content, search_results, '')
+
+    # 5.0 base, +0.3 for trend.az, +0.4 for two distinct domains
+    assert result['source_score'] == pytest.approx(5.7)
+
+
+def test_analyze_many_matches_single_analyses(analyzer):
+    """Batch analysis returns the same results as one call per item"""
+    items = [
+        ("SHOCKING!!! You won't believe this cover-up, EVERYONE MUST KNOW the hidden truth today!", {}, ''),
+        ("By our reporter: on 12.05.2023 the ministry said inflation fell to 5% from 7%, however "
+         "analysts expect 30 manat price rises.\nThe statement was published in full.",
+         {'official_sources': [{'link': 'https://gov.az/a', 'snippet': 'ministry said inflation fell'}],
+          'news_sources': [{'link': 'https://trend.az/x', 'snippet': 'inflation fell to 5%'},
+                           {'link': 'https://www.bbc.com/y', 'snippet': 'analysts expect price rises'}]},
+         'Reuters, rəsmi nazirlik'),
+        ("too short", {}, ''),
+        ("Anonim mənbəyə görə, daxili mənbələr sızan məlumat barədə danışır, lakin təsdiq yoxdur.",
+         {'news_sources': [{'link': 'http://[bad/x', 'snippet': ''}]}, 'official')
+    ]
+    expected = [analyzer.analyze_credibility(*item) for item in items]
+
+    for max_workers in (None, 2):
+        results = CredibilityAnalyzer().analyze_many(items, max_workers=max_workers)
+        assert results == expected
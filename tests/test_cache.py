@@ -0,0 +1,55 @@
+import os
+import sys
+
+# Add the src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from newschecker.core.cache import NewsCache
+
+
+def test_set_many_stores_every_item():
+    """Batch stores are readable like single sets, for any key type"""
+    cache = NewsCache(max_memory_mb=1)
+    items = [(f'query {i}', {'results': [i]}) for i in range(10)]
+    items += [({'source': 'trend.az'}, 'dict key'), ('L' * 300, 'long key')]
+
+    assert cache.set_many(items, 'search') == len(items)
+
+    for content, value in items:
+        assert cache.get(content, 'search') == value
+        assert cache.get(content) is None  # Stored under the given cache type only
+    assert cache.get_stats()['type_distribution']['search'] == len(items)
+
+
+def test_set_many_honours_custom_ttl_and_overwrites():
+    """A batch replaces existing entries and applies its TTL to each"""
+    cache = NewsCache(max_memory_mb=1)
+    cache.set('news text', 'old analysis', 'analysis')
+
+    assert cache.set_many([('news text', 'new analysis')], 'analysis', custom_ttl=0) == 1
+
+    assert cache.get_cached_analysis('news text') == 'new analysis'
+    assert cache.get_entry_info('news text', 'analysis')['expiry_time'] is None
+
+
+def test_set_many_respects_memory_limit():
+    """A batch larger than the cache evicts entries instead of overflowing"""
+    cache = NewsCache(max_memory_mb=1)
+
+    stored = cache.set_many([(f'big {i}', 'x' * 10000) for i in range(150)])
+
+    assert 0 < stored < 150
+    assert cache.get_stats()['memory_usage_mb'] <= 1.0
+
+
+def test_set_rejects_oversized_entry_without_evicting():
+    """A value larger than the whole cache is refused and nothing is evicted for it"""
+    cache = NewsCache(max_memory_mb=1)
+    for i in range(50):
+        assert cache.set(f'entry {i}', 'x' * 10000)
+
+    assert not cache.set('huge', 'x' * (2 * 1024 * 1024))
+
+    assert cache.get('huge') is None
+    assert cache.get_stats()['total_entries'] == 50
+    assert cache.get_stats()['evictions'] == 0
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+# Add the src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from newschecker.core import database
+from newschecker.core.database import NewsDatabase
+
+# news_analysis and performance_metrics as the first release created them
+BASELINE_SCHEMA = '''
+    CREATE TABLE news_analysis (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        content_hash TEXT UNIQUE NOT NULL,
+        news_content TEXT NOT NULL,
+        news_type TEXT NOT NULL DEFAULT 'text',
+        keywords TEXT,
+        mentioned_sources TEXT,
+        official_sources TEXT,
+        news_sources TEXT,
+        analysis_result TEXT NOT NULL,
+        credibility_score INTEGER,
+        analyzed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE performance_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        operation_type TEXT NOT NULL,
+        execution_time_ms REAL NOT NULL,
+        success BOOLEAN NOT NULL DEFAULT 1,
+        error_details TEXT,
+        user_id INTEGER,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_news_analysis_user_id ON news_analysis(user_id);
+    CREATE INDEX idx_news_analysis_content_hash ON news_analysis(content_hash);
+    CREATE INDEX idx_news_analysis_date ON news_analysis(analyzed_date);
+    CREATE INDEX idx_performance_metrics_type ON performance_metrics(operation_type);
+'''
+
+
+def create_baseline_db(path):
+    """Create a database file with the baseline schema and a few rows."""
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    for user_id, content, keywords, mentioned, result, score, date in (
+        (1, 'Hello World', 'budget economy', '- Mənbə adı: Trend\n', 'Result one', 7, '2024-03-01 12:00:00'),
+        (2, 'Second story', 'weather', '', 'Result two', 4, '2024-03-02 08:30:00'),
+    ):
+        content_hash = hashlib.sha256(content.lower().strip().encode('utf-8')).hexdigest()
+        conn.execute('''
+            INSERT INTO news_analysis
+            (user_id, content_hash, news_content, news_type, keywords, mentioned_sources,
+             official_sources, news_sources, analysis_result, credibility_score, analyzed_date)
+            VALUES (?, ?, ?, 'text', ?, ?, '[]', '[]', ?, ?, ?)
+        ''', (user_id, content_hash, content, keywords, mentioned, result, score, date))
+    conn.execute("INSERT INTO performance_metrics (operation_type, execution_time_ms, timestamp) "
+                 "VALUES ('analyze', 12.5, '2024-03-01 12:00:01')")
+    conn.commit()
+    conn.close()
+
+
+def test_baseline_database_is_migrated(tmp_path):
+    """Opening a baseline database moves payloads out and rewrites hashes and timestamps"""
+    db_path = str(tmp_path / 'baseline.db')
+    create_baseline_db(db_path)
+
+    db = NewsDatabase(db_path)
+    try:
+        conn = sqlite3.connect(db_path)
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(news_analysis)')}
+        assert not columns & {'news_content', 'official_sources', 'news_sources', 'analysis_result'}
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == database._SCHEMA_VERSION
+        assert conn.execute("SELECT count(*) FROM news_analysis WHERE typeof(content_hash) != 'blob' "
+                            "OR typeof(analyzed_date) != 'integer'").fetchone()[0] == 0
+        assert conn.execute("SELECT typeof(timestamp) FROM performance_metrics").fetchone()[0] == 'integer'
+        conn.close()
+
+        duplicate = db.check_duplicate(' hello world')
+        assert duplicate['analysis_result'] == 'Result one'
+        assert duplicate['credibility_score'] == 7
+
+        analysis = db.get_analysis_by_id(2)
+        assert analysis['news_content'] == 'Second story'
+        assert analysis['official_sources'] == []
+
+        assert [row['id'] for row in db.search_analyses('budget')] == [1]
+        assert [row['id'] for row in db.get_analyses_by_source('Trend')] == [1]
+    finally:
+        db.close()
+
+    # A second open finds the current schema and leaves the data alone
+    db = NewsDatabase(db_path)
+    try:
+        assert db.get_database_stats()['total_analyses'] == 2
+    finally:
+        db.close()
+
+
+def test_migration_requires_drop_column_support(tmp_path, monkeypatch):
+    """Upgrading a baseline database on SQLite without DROP COLUMN fails clearly"""
+    db_path = str(tmp_path / 'baseline.db')
+    create_baseline_db(db_path)
+    monkeypatch.setattr(database.sqlite3, 'sqlite_version_info', (3, 34, 1))
+
+    with pytest.raises(RuntimeError, match='3.35.0'):
+        NewsDatabase(db_path)
+
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(news_analysis)')}
+    assert 'news_content' in columns
+    conn.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    news_db = NewsDatabase(str(tmp_path / 'news.db'))
+    yield news_db
+    news_db.close()
+
+
+def test_save_analyses_bulk_matches_single_saves(db):
+    """Bulk-saved analyses are stored, counted and found like single saves"""
+    rows = [
+        (1, 'First story text', 'text', 'budget', '', [{'link': 'https://gov.az'}], [], 'Result one', 8),
+        (1, 'Second story text', 'url', 'weather', '', [], [{'link': 'https://trend.az'}], 'Result two', 4),
+        (2, 'Third story text', 'text', 'sports', '', [], [], 'Result three', 6),
+    ]
+
+    assert db.save_analyses_bulk(rows) == 3
+    assert db.save_analyses_bulk([]) == 0
+
+    duplicate = db.check_duplicate('  second STORY text ')
+    assert duplicate['analysis_result'] == 'Result two'
+    assert duplicate['credibility_score'] == 4
+
+    analysis = db.get_analysis_by_id(next(db.get_user_history(2))['id'])
+    assert analysis['news_content'] == 'Third story text'
+    assert analysis['official_sources'] == []
+
+    stats = db.get_user_stats(1)
+    assert stats['total_analyses'] == 2
+    assert stats['average_credibility_score'] == pytest.approx(6.0)
+    assert db.get_database_stats()['total_analyses'] == 3
+
+
+def test_search_analyses_and_get_analyses_by_source(db):
+    """Keyword search uses the full-text index and source lookup the sources table"""
+    db.save_analysis(1, 'Budget story', 'text', 'dövlət büdcəsi economy', '- Mənbə adı: Trend\n- Mənbə adı: APA\n',
+                     [], [], 'Result one', 7)
+    db.save_analysis(2, 'Weather story', 'text', 'weather forecast', '- Mənbə adı: APA\n', [], [], 'Result two', 5)
+
+    assert [row['keywords'] for row in db.search_analyses('büdcəsi')] == ['dövlət büdcəsi economy']
+    assert {row['news_type'] for row in db.search_analyses('economy')} == {'text'}
+    assert db.search_analyses('"unmatched') == []
+    assert db.search_analyses('   ') == []
+
+    assert [row['keywords'] for row in db.get_analyses_by_source(' Trend ')] == ['dövlət büdcəsi economy']
+    assert len(db.get_analyses_by_source('APA')) == 2
+    assert db.get_analyses_by_source('APA', limit=1)[0]['credibility_score'] in (5, 7)
+    assert db.get_analyses_by_source('Reuters') == []
+
+    # Re-saving the same content replaces its index entries
+    db.save_analysis(1, 'Budget story', 'text', 'revised figures', '', [], [], 'Result three', 6)
+    assert db.search_analyses('economy') == []
+    assert [row['credibility_score'] for row in db.search_analyses('revised')] == [6]
+    assert db.get_analyses_by_source('Trend') == []
+
+
+def set_analyzed_dates(db, dates):
+    """Overwrite analyzed_date for analyses, given as {id: epoch seconds}."""
+    conn = sqlite3.connect(str(db.db_path))
+    conn.executemany('UPDATE news_analysis SET analyzed_date = ? WHERE id = ?',
+                     [(date, analysis_id) for analysis_id, date in dates.items()])
+    conn.commit()
+    conn.close()
+
+
+def test_get_user_history_pages_by_keyset(db):
+    """Each page starts right after the previous page's last (analyzed_date, id)"""
+    for i in range(5):
+        db.save_analysis(1, f'User one story {i}', 'text', '', '', [], [], f'Result {i}', i)
+    db.save_analysis(2, 'Other user story', 'text', '', '', [], [], 'Other', 5)
+    # Ids 3-5 share one second and ids 1-2 another, so ties are broken by id
+    set_analyzed_dates(db, {1: 1000, 2: 1000, 3: 2000, 4: 2000, 5: 2000, 6: 3000})
+
+    pages = []
+    before = None
+    while True:
+        page = list(db.get_user_history(1, limit=2, before=before))
+        if not page:
+            break
+        pages.append([(row['analyzed_date'], row['id']) for row in page])
+        before = (page[-1]['analyzed_date'], page[-1]['id'])
+
+    assert pages == [
+        [(2000, 5), (2000, 4)],
+        [(2000, 3), (1000, 2)],
+        [(1000, 1)]
+    ]
+
+
+def test_cleanup_old_data_respects_max_rows(db):
+    """max_rows caps one cleanup call; payloads and sources go with their analyses"""
+    for i in range(5):
+        db.save_analysis(1, f'Cleanup story {i}', 'text', f'topic{i}', '- Mənbə adı: APA\n', [], [], f'Result {i}', 5)
+    old = int(time.time()) - 100 * 86400
+    set_analyzed_dates(db, {1: old, 2: old, 3: old, 4: old})
+
+    assert db.cleanup_old_data(days_old=90, max_rows=3) == 3
+    assert db.get_database_stats()['total_analyses'] == 2
+
+    assert db.cleanup_old_data(days_old=90) == 1
+    assert db.cleanup_old_data(days_old=90) == 0
+
+    conn = sqlite3.connect(str(db.db_path))
+    assert [row[0] for row in conn.execute('SELECT id FROM news_analysis')] == [5]
+    assert [row[0] for row in conn.execute('SELECT id FROM news_analysis_payload')] == [5]
+    assert [row[0] for row in conn.execute('SELECT analysis_id FROM analysis_mentioned_sources')] == [5]
+    conn.close()
+    assert db.check_duplicate('Cleanup story 0') is None
+    assert db.check_duplicate('Cleanup story 4')['analysis_result'] == 'Result 4'
+
+
+def test_format_timestamp(monkeypatch):
+    """Epoch seconds render in local time, with an optional format; None renders empty"""
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    try:
+        assert database.format_timestamp(1709294400) == '2024-03-01 12:00:00'
+        assert database.format_timestamp(1709294400, '%d.%m.%Y') == '01.03.2024'
+        assert database.format_timestamp(0) == '1970-01-01 00:00:00'
+        assert database.format_timestamp(None) == ''
+    finally:
+        monkeypatch.undo()
+        time.tzset()